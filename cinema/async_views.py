@@ -0,0 +1,148 @@
+"""
+Async-native read endpoints of the catalog for ASGI deployments.
+
+They reuse the viewsets for querysets, filters, pagination, permissions
+and serializers, so responses match the sync endpoints, but read every
+row with the async ORM instead of holding a thread per request. Lists
+are read as values() rows like the compiled list serializers do, pages
+and details as objects with everything they render prefetched, so
+serializing them doesn't query. There is no catalog response cache and
+no streaming here.
+"""
+
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from cinema.views import MovieViewSet, MovieSessionViewSet
+
+
+def _build_view(request, viewset_class, action, **kwargs):
+    view = viewset_class(
+        action=action, format_kwarg=None, args=(), kwargs=kwargs, headers={}
+    )
+    view.request = Request(
+        request,
+        parsers=view.get_parsers(),
+        authenticators=view.get_authenticators(),
+        negotiator=view.get_content_negotiator(),
+    )
+    return view
+
+
+async def _authenticate(request):
+    """Request._authenticate() awaiting the authenticators with an
+    `aauthenticate()`, the others mustn't query the database"""
+    for authenticator in request.authenticators:
+        aauthenticate = getattr(authenticator, "aauthenticate", None)
+        try:
+            if aauthenticate is not None:
+                user_auth_tuple = await aauthenticate(request)
+            else:
+                user_auth_tuple = authenticator.authenticate(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+
+    request._not_authenticated()
+
+
+def _render(view, data, status=200):
+    renderer = view.get_renderers()[0]
+    response = HttpResponse(
+        renderer.render(
+            data,
+            renderer_context={"view": view, "request": view.request},
+        ),
+        content_type=renderer.media_type,
+        status=status,
+    )
+    response["Vary"] = "Accept"
+    return response
+
+
+def _error_response(view, exc):
+    """Same payload and status as APIView.handle_exception"""
+    auth_header = None
+    if isinstance(
+        exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    ):
+        auth_header = view.get_authenticate_header(view.request)
+        if not auth_header:
+            exc.status_code = 403
+
+    response = _render(view, {"detail": exc.detail}, status=exc.status_code)
+    if auth_header:
+        response["WWW-Authenticate"] = auth_header
+    return response
+
+
+async def _list(request, viewset_class):
+    view = _build_view(request, viewset_class, "list")
+    try:
+        await _authenticate(view.request)
+        view.check_permissions(view.request)
+        queryset = view.filter_queryset(view.get_queryset())
+
+        page = None
+        if view.paginator is not None:
+            page = await view.paginator.apaginate_queryset(
+                queryset, view.request, view=view
+            )
+    except exceptions.APIException as exc:
+        return _error_response(view, exc)
+
+    if page is not None:
+        data = view.get_serializer(page, many=True).data
+        return _render(
+            view, view.paginator.get_paginated_response(data).data
+        )
+
+    serializer = view.get_serializer(queryset, many=True)
+    return _render(view, await serializer.ato_representation(queryset))
+
+
+async def _retrieve(request, viewset_class, pk, prefetch=()):
+    view = _build_view(request, viewset_class, "retrieve", pk=pk)
+    try:
+        await _authenticate(view.request)
+        view.check_permissions(view.request)
+        queryset = view.filter_queryset(view.get_queryset())
+        try:
+            instance = await queryset.prefetch_related(*prefetch).aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise exceptions.NotFound(
+                f"No {queryset.model._meta.object_name} "
+                "matches the given query."
+            )
+    except exceptions.APIException as exc:
+        return _error_response(view, exc)
+
+    return _render(view, view.get_serializer(instance).data)
+
+
+async def movie_list(request):
+    return await _list(request, MovieViewSet)
+
+
+async def movie_detail(request, pk):
+    return await _retrieve(request, MovieViewSet, pk)
+
+
+async def movie_session_list(request):
+    return await _list(request, MovieSessionViewSet)
+
+
+async def movie_session_detail(request, pk):
+    # the sync view loads the genres and actors of the movie lazily
+    return await _retrieve(
+        request,
+        MovieSessionViewSet,
+        pk,
+        prefetch=("movie__genres", "movie__actors"),
+    )
@@ -0,0 +1,782 @@
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from cinema import search
+from cinema.cache import catalog_cache
+from cinema.fragments import fragment_cache
+from cinema.models import (
+    Actor,
+    CinemaHall,
+    Genre,
+    Movie,
+    MovieSession,
+    Order,
+    Ticket,
+)
+from cinema.renderers import FastJSONRenderer
+from cinema.seat_map import SeatMap
+from cinema.serializers import (
+    MovieDetailSerializer,
+    MovieListSerializer,
+    MovieSessionDetailSerializer,
+    MovieSessionListSerializer,
+)
+from cinema_service.database import SQLITE_PRAGMAS, sqlite_init_command
+
+BATCH_SIZE = 5000
+BENCHMARK_PASSWORD = "benchmark-password"
+BENCHMARK_EMAIL = "benchmark.admin@cinema.com"
+
+
+def _bulk_create(model, objects):
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def seed_dataset(
+    movies=1000,
+    movie_sessions=5000,
+    users=1000,
+    orders=10000,
+    tickets=50000,
+    genres=20,
+    actors=500,
+    cinema_halls=20,
+    seed=0,
+):
+    """Fill the database with a synthetic dataset of the given size
+    and return the number of created rows per model"""
+    rng = random.Random(seed)
+
+    halls = _bulk_create(
+        CinemaHall,
+        [
+            CinemaHall(
+                name=f"Hall {index}",
+                rows=rng.randint(10, 30),
+                seats_in_row=rng.randint(10, 30),
+            )
+            for index in range(cinema_halls)
+        ],
+    )
+    genre_ids = [
+        genre.id
+        for genre in _bulk_create(
+            Genre, [Genre(name=f"Genre {index}") for index in range(genres)]
+        )
+    ]
+    actor_ids = [
+        actor.id
+        for actor in _bulk_create(
+            Actor,
+            [
+                Actor(first_name=f"First{index}", last_name=f"Last{index}")
+                for index in range(actors)
+            ],
+        )
+    ]
+    movie_ids = [
+        movie.id
+        for movie in _bulk_create(
+            Movie,
+            [
+                Movie(
+                    title=f"Movie {index}",
+                    description=f"Description of movie {index}",
+                    duration=rng.randint(80, 180),
+                )
+                for index in range(movies)
+            ],
+        )
+    ]
+    _bulk_create(
+        Movie.genres.through,
+        [
+            Movie.genres.through(movie_id=movie_id, genre_id=genre_id)
+            for movie_id in movie_ids
+            for genre_id in rng.sample(genre_ids, min(2, len(genre_ids)))
+        ],
+    )
+    _bulk_create(
+        Movie.actors.through,
+        [
+            Movie.actors.through(movie_id=movie_id, actor_id=actor_id)
+            for movie_id in movie_ids
+            for actor_id in rng.sample(actor_ids, min(3, len(actor_ids)))
+        ],
+    )
+    search.index_movies(movie_ids)
+
+    first_show = datetime(2022, 6, 1, 10)
+    sessions = _bulk_create(
+        MovieSession,
+        [
+            MovieSession(
+                show_time=first_show + timedelta(hours=rng.randint(0, 2000)),
+                movie_id=rng.choice(movie_ids),
+                cinema_hall=rng.choice(halls),
+            )
+            for _ in range(movie_sessions)
+        ],
+    )
+
+    password = make_password(BENCHMARK_PASSWORD)
+    user_ids = [benchmark_user().id] + [
+        user.id
+        for user in _bulk_create(
+            get_user_model(),
+            [
+                get_user_model()(
+                    email=f"user{index}@cinema.com", password=password
+                )
+                for index in range(users)
+            ],
+        )
+    ]
+    order_ids = [
+        order.id
+        for order in _bulk_create(
+            Order, [Order(user_id=rng.choice(user_ids)) for _ in range(orders)]
+        )
+    ]
+
+    new_tickets = []
+    for movie_session in sessions:
+        if len(new_tickets) >= tickets:
+            break
+        hall = movie_session.cinema_hall
+        seat_map = SeatMap(hall.rows, hall.seats_in_row)
+        places = min(
+            hall.capacity,
+            tickets - len(new_tickets),
+            rng.randint(0, hall.capacity),
+        )
+        for index in range(places):
+            row, seat = divmod(index, hall.seats_in_row)
+            seat_map.take(row + 1, seat + 1)
+            new_tickets.append(
+                Ticket(
+                    movie_session=movie_session,
+                    order_id=rng.choice(order_ids),
+                    row=row + 1,
+                    seat=seat + 1,
+                )
+            )
+        movie_session.taken_seats = seat_map.to_bytes()
+        movie_session.tickets_sold = seat_map.taken_count
+    _bulk_create(Ticket, new_tickets)
+    MovieSession.objects.bulk_update(
+        sessions, ["taken_seats", "tickets_sold"], batch_size=BATCH_SIZE
+    )
+
+    return {
+        "cinema_halls": len(halls),
+        "genres": len(genre_ids),
+        "actors": len(actor_ids),
+        "movies": len(movie_ids),
+        "movie_sessions": len(sessions),
+        "users": len(user_ids) - 1,
+        "orders": len(order_ids),
+        "tickets": len(new_tickets),
+    }
+
+
+def _free_places(movie_session):
+    seat_map = movie_session.seat_map
+    for row in range(1, seat_map.rows + 1):
+        for seat in range(1, seat_map.seats_in_row + 1):
+            if not seat_map.is_taken(row, seat):
+                yield row, seat
+
+
+def _numbered(make_payload):
+    """Payload factory calling `make_payload` with a new string each
+    time, for endpoints creating rows with unique fields, unique across
+    runs on a kept database too"""
+    run = uuid.uuid4().hex[:8]
+    numbers = itertools.count()
+    return lambda: make_payload(f"{run}-{next(numbers)}")
+
+
+def _order_payloads(movie_session):
+    places = _free_places(movie_session)
+
+    def make_payload():
+        row, seat = next(places, (0, 0))
+        return {
+            "tickets": [
+                {"row": row, "seat": seat, "movie_session": movie_session.id}
+            ]
+        }
+
+    return make_payload
+
+
+def _endpoints():
+    """(name, method, url, payload) of every router endpoint, where the
+    payload may be a callable building a new one for every request"""
+    movie = Movie.objects.order_by("id").first()
+    movie_session = MovieSession.objects.order_by("-tickets_sold").first()
+    order_session, hold_session = MovieSession.objects.select_related(
+        "cinema_hall"
+    ).order_by("tickets_sold", "id")[:2]
+    refresh = RefreshToken.for_user(benchmark_user())
+    session_payload = {
+        "show_time": "2022-06-02T14:00:00",
+        "movie": movie.id,
+        "cinema_hall": movie_session.cinema_hall_id,
+    }
+    hold_payload = {
+        "seats": [
+            {"row": row, "seat": seat}
+            for row, seat in itertools.islice(_free_places(hold_session), 2)
+        ]
+    }
+    return [
+        ("genres.list", "get", reverse("cinema:genre-list"), None),
+        (
+            "genres.create",
+            "post",
+            reverse("cinema:genre-list"),
+            _numbered(lambda number: {"name": f"Benchmark genre {number}"}),
+        ),
+        ("actors.list", "get", reverse("cinema:actor-list"), None),
+        (
+            "actors.create",
+            "post",
+            reverse("cinema:actor-list"),
+            {"first_name": "Benchmark", "last_name": "Actor"},
+        ),
+        ("cinema_halls.list", "get", reverse("cinema:cinemahall-list"), None),
+        (
+            "cinema_halls.create",
+            "post",
+            reverse("cinema:cinemahall-list"),
+            {"name": "Benchmark hall", "rows": 10, "seats_in_row": 10},
+        ),
+        ("movies.list", "get", reverse("cinema:movie-list"), None),
+        (
+            "movies.list.page",
+            "get",
+            reverse("cinema:movie-list") + "?page_size=20",
+            None,
+        ),
+        (
+            "movies.retrieve",
+            "get",
+            reverse("cinema:movie-detail", args=[movie.id]),
+            None,
+        ),
+        (
+            "movies.create",
+            "post",
+            reverse("cinema:movie-list"),
+            {
+                "title": "Benchmark movie",
+                "description": "Description of the benchmark movie",
+                "duration": 90,
+                "genres": list(movie.genres.values_list("id", flat=True)),
+                "actors": list(movie.actors.values_list("id", flat=True)),
+            },
+        ),
+        (
+            "movie_sessions.list",
+            "get",
+            reverse("cinema:moviesession-list"),
+            None,
+        ),
+        (
+            "movie_sessions.retrieve",
+            "get",
+            reverse("cinema:moviesession-detail", args=[movie_session.id]),
+            None,
+        ),
+        (
+            "movie_sessions.create",
+            "post",
+            reverse("cinema:moviesession-list"),
+            session_payload,
+        ),
+        (
+            "movie_sessions.update",
+            "put",
+            reverse("cinema:moviesession-detail", args=[movie_session.id]),
+            session_payload,
+        ),
+        (
+            "movie_sessions.holds.create",
+            "post",
+            reverse("cinema:moviesession-holds", args=[hold_session.id]),
+            hold_payload,
+        ),
+        (
+            "movie_sessions.holds.delete",
+            "delete",
+            reverse("cinema:moviesession-holds", args=[hold_session.id]),
+            None,
+        ),
+        ("orders.list", "get", reverse("cinema:order-list"), None),
+        (
+            "orders.create",
+            "post",
+            reverse("cinema:order-list"),
+            _order_payloads(order_session),
+        ),
+        ("user.me", "get", reverse("user:manage"), None),
+        (
+            "user.register",
+            "post",
+            reverse("user:create"),
+            _numbered(
+                lambda number: {
+                    "email": f"benchmark{number}@cinema.com",
+                    "password": BENCHMARK_PASSWORD,
+                }
+            ),
+        ),
+        (
+            "user.login",
+            "post",
+            reverse("user:login"),
+            {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD},
+        ),
+        (
+            "user.token",
+            "post",
+            reverse("user:token_obtain_pair"),
+            {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD},
+        ),
+        (
+            "user.token.refresh",
+            "post",
+            reverse("user:token_refresh"),
+            {"refresh": str(refresh)},
+        ),
+        (
+            "user.token.revoke",
+            "post",
+            reverse("user:token_revoke"),
+            {"refresh": str(RefreshToken.for_user(benchmark_user()))},
+        ),
+    ]
+
+
+def _percentile(timings, percent):
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100)[percent - 1]
+
+
+def measure(request, repeat, warm_cache=False):
+    """Run the request `repeat` times and return its latency
+    percentiles, queries per request and peak traced memory"""
+    timings, queries, status_code = [], [], None
+    for _ in range(repeat):
+        if not warm_cache:
+            catalog_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(context.captured_queries))
+        status_code = response.status_code
+
+    if not warm_cache:
+        catalog_cache().clear()
+    tracemalloc.start()
+    request()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": status_code,
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "p99_ms": round(_percentile(timings, 99), 3),
+        "queries": round(statistics.mean(queries), 2),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def benchmark_user():
+    user = get_user_model().objects.filter(email=BENCHMARK_EMAIL).first()
+    if user is None:
+        user = get_user_model().objects.create_superuser(
+            BENCHMARK_EMAIL, BENCHMARK_PASSWORD
+        )
+    return user
+
+
+def benchmark_client():
+    token, _ = Token.objects.get_or_create(user=benchmark_user())
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def _request(client, method, url, payload):
+    if method in ("get", "delete"):
+        return getattr(client, method)(url)
+    if callable(payload):
+        payload = payload()
+    return getattr(client, method)(url, payload, format="json")
+
+
+def run_endpoints(repeat=50, warm_cache=False, only=None):
+    """Drive every router endpoint through the test client"""
+    client = benchmark_client()
+    results = {}
+    for name, method, url, payload in _endpoints():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = measure(
+            partial(_request, client, method, url, payload),
+            repeat,
+            warm_cache=warm_cache,
+        )
+    return results
+
+
+def _load_endpoints():
+    """(name, sync url, async url) of the endpoints with an async view"""
+    movie = Movie.objects.order_by("id").first()
+    movie_session = MovieSession.objects.order_by("id").first()
+    return [
+        (
+            "movies.list",
+            reverse("cinema:movie-list"),
+            reverse("cinema:movie-list-async"),
+        ),
+        (
+            "movies.retrieve",
+            reverse("cinema:movie-detail", args=[movie.id]),
+            reverse("cinema:movie-detail-async", args=[movie.id]),
+        ),
+        (
+            "movie_sessions.list",
+            reverse("cinema:moviesession-list"),
+            reverse("cinema:moviesession-list-async"),
+        ),
+        (
+            "movie_sessions.list.page",
+            reverse("cinema:moviesession-list") + "?page_size=20",
+            reverse("cinema:moviesession-list-async") + "?page_size=20",
+        ),
+        (
+            "movie_sessions.retrieve",
+            reverse("cinema:moviesession-detail", args=[movie_session.id]),
+            reverse(
+                "cinema:moviesession-detail-async", args=[movie_session.id]
+            ),
+        ),
+    ]
+
+
+async def _load(client, url, headers, concurrency, requests):
+    """Send `requests` GETs with at most `concurrency` in flight and
+    return the throughput and latency percentiles"""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, statuses = [], set()
+    separator = "&" if "?" in url else "?"
+
+    async def send(number):
+        async with semaphore:
+            started = time.perf_counter()
+            # a query string of its own misses the catalog response
+            # cache of the sync views, the async views have none
+            response = await client.get(
+                f"{url}{separator}request={number}", headers=headers
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses.add(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(number) for number in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "status": sorted(statuses),
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+    }
+
+
+def run_async_load(concurrency=(1, 10, 50), requests=200, only=None):
+    """Compare the sync and async catalog endpoints under concurrent
+    load through the ASGI test client, both uncached"""
+    token, _ = Token.objects.get_or_create(user=benchmark_user())
+    client = AsyncClient()
+    headers = {"Authorization": f"Token {token.key}"}
+    endpoints = _load_endpoints()
+
+    async def run():
+        results = {}
+        for name, sync_url, async_url in endpoints:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = {
+                str(level): {
+                    "sync": await _load(
+                        client, sync_url, headers, level, requests
+                    ),
+                    "async": await _load(
+                        client, async_url, headers, level, requests
+                    ),
+                }
+                for level in concurrency
+            }
+        return results
+
+    catalog_cache().clear()
+    return async_to_sync(run)()
+
+
+def _serialize(serializer_class, queryset, compiled):
+    if compiled:
+        serializer = serializer_class(queryset, many=True)
+    else:
+        serializer = ListSerializer(queryset, child=serializer_class())
+    return serializer.data
+
+
+def compare_list_serializers(repeat=5):
+    """CPU time per row of the compiled list serializers against
+    the DRF field machinery on the same querysets"""
+    cases = [
+        (
+            "movies",
+            MovieListSerializer,
+            Movie.objects.prefetch_related("genres", "actors"),
+        ),
+        (
+            "movie_sessions",
+            MovieSessionListSerializer,
+            MovieSession.objects.select_related("movie", "cinema_hall"),
+        ),
+    ]
+    results = {}
+    for name, serializer_class, queryset in cases:
+        rows = queryset.count() or 1
+        result = {"rows": rows}
+        outputs = {}
+        for mode, compiled in (("drf", False), ("compiled", True)):
+            timings = []
+            for _ in range(repeat):
+                started = time.process_time()
+                outputs[mode] = _serialize(
+                    serializer_class, queryset.all(), compiled
+                )
+                timings.append(time.process_time() - started)
+            result[f"{mode}_us_per_row"] = round(
+                min(timings) / rows * 1_000_000, 2
+            )
+        result["speedup"] = round(
+            result["drf_us_per_row"] / (result["compiled_us_per_row"] or 1),
+            1,
+        )
+        result["identical"] = outputs["drf"] == outputs["compiled"]
+        results[name] = result
+    return results
+
+
+def _best_time_us(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return result, round(min(timings) * 1_000_000, 1)
+
+
+def compare_renderers(repeat=20):
+    """Serialization with cold and warm pre-encoded fragments and
+    rendering time of JSONRenderer against FastJSONRenderer"""
+    movie_session = (
+        MovieSession.objects.select_related("movie", "cinema_hall")
+        .order_by("-tickets_sold")
+        .first()
+    )
+    movie = Movie.objects.prefetch_related("genres", "actors").first()
+    cases = [
+        (
+            "movie_sessions.retrieve",
+            lambda: MovieSessionDetailSerializer(movie_session).data,
+        ),
+        ("movies.retrieve", lambda: MovieDetailSerializer(movie).data),
+        (
+            "movies.list",
+            lambda: MovieListSerializer(
+                Movie.objects.prefetch_related("genres", "actors"), many=True
+            ).data,
+        ),
+    ]
+    results = {}
+    for name, serialize in cases:
+        fragment_cache.clear()
+        catalog_cache().clear()
+        _, cold_us = _best_time_us(serialize, 1)
+        data, warm_us = _best_time_us(serialize, repeat)
+        content, json_us = _best_time_us(
+            partial(JSONRenderer().render, data), repeat
+        )
+        fast_content, fast_us = _best_time_us(
+            partial(FastJSONRenderer().render, data), repeat
+        )
+        results[name] = {
+            "bytes": len(content),
+            "serialize_cold_us": cold_us,
+            "serialize_warm_us": warm_us,
+            "json_render_us": json_us,
+            "fast_render_us": fast_us,
+            "render_speedup": round(json_us / (fast_us or 1), 1),
+            "identical": content == fast_content,
+        }
+    return results
+
+
+SQLITE_MODES = {
+    "rollback_journal": (
+        {"journal_mode": "DELETE", "synchronous": "FULL"},
+        "BEGIN",
+    ),
+    "tuned": (SQLITE_PRAGMAS, "BEGIN IMMEDIATE"),
+}
+
+
+def _sqlite_connect(path, pragmas):
+    conn = sqlite3.connect(path, isolation_level=None, timeout=5)
+    conn.executescript(sqlite_init_command(pragmas))
+    return conn
+
+
+def _sqlite_writer(path, pragmas, begin, stop, result):
+    # an order: read the seat map, insert a ticket, update the session
+    conn = _sqlite_connect(path, pragmas)
+    seat = 0
+    while not stop.is_set():
+        seat += 1
+        started = time.perf_counter()
+        try:
+            conn.execute(begin)
+            conn.execute("SELECT tickets_sold FROM session WHERE id = 1")
+            conn.execute(
+                "INSERT INTO ticket (session_id, row, seat) VALUES (1, ?, ?)",
+                (threading.get_ident(), seat),
+            )
+            conn.execute(
+                "UPDATE session SET tickets_sold = tickets_sold + 1 "
+                "WHERE id = 1"
+            )
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            result["busy"] += 1
+            continue
+        result["writes"].append(time.perf_counter() - started)
+    conn.close()
+
+
+def _sqlite_reader(path, pragmas, stop, result):
+    # a seat map: the session and its tickets
+    conn = _sqlite_connect(path, pragmas)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            conn.execute("SELECT tickets_sold FROM session WHERE id = 1")
+            conn.execute(
+                "SELECT row, seat FROM ticket WHERE session_id = 1 "
+                "ORDER BY id DESC LIMIT 100"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            result["busy"] += 1
+            continue
+        result["reads"].append(time.perf_counter() - started)
+    conn.close()
+
+
+def _sqlite_load(path, pragmas, begin, readers, writers, duration):
+    conn = _sqlite_connect(path, pragmas)
+    conn.executescript(
+        "CREATE TABLE session (id INTEGER PRIMARY KEY, tickets_sold INT);"
+        "CREATE TABLE ticket (id INTEGER PRIMARY KEY, session_id INT, "
+        "row INT, seat INT, UNIQUE (session_id, row, seat));"
+        "INSERT INTO session VALUES (1, 0);"
+    )
+    conn.close()
+
+    stop = threading.Event()
+    result = {"reads": [], "writes": [], "busy": 0}
+    threads = [
+        threading.Thread(
+            target=_sqlite_writer, args=(path, pragmas, begin, stop, result)
+        )
+        for _ in range(writers)
+    ] + [
+        threading.Thread(
+            target=_sqlite_reader, args=(path, pragmas, stop, result)
+        )
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = [timing * 1000 for timing in result["reads"]] or [0]
+    writes = [timing * 1000 for timing in result["writes"]] or [0]
+    return {
+        "reads_per_second": round(len(result["reads"]) / duration),
+        "writes_per_second": round(len(result["writes"]) / duration),
+        "read_p99_ms": round(_percentile(reads, 99), 3),
+        "write_p99_ms": round(_percentile(writes, 99), 3),
+        "busy_errors": result["busy"],
+    }
+
+
+def compare_sqlite_modes(readers=4, writers=2, duration=2.0):
+    """Throughput and latency of concurrent seat map reads and order
+    writes on a database file with the default rollback journal and
+    with the tuned pragmas and BEGIN IMMEDIATE of the settings"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, (pragmas, begin) in SQLITE_MODES.items():
+            results[mode] = _sqlite_load(
+                os.path.join(directory, f"{mode}.sqlite3"),
+                pragmas,
+                begin,
+                readers,
+                writers,
+                duration,
+            )
+    results["read_speedup"] = round(
+        results["tuned"]["reads_per_second"]
+        / (results["rollback_journal"]["reads_per_second"] or 1),
+        1,
+    )
+    return results
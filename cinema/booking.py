@@ -0,0 +1,317 @@
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cinema.models import MovieSession, Order, SeatHold, Ticket
+from cinema.seat_map import SeatMap
+from cinema_service.database import immediate_atomic
+
+SEAT_TAKEN_MESSAGE = (
+    "The fields movie_session, row, seat must make a unique set."
+)
+SEAT_HELD_MESSAGE = "The seat is held by another customer."
+
+
+class SeatHoldLimitExceeded(Exception):
+    """The user would hold more than SEAT_HOLD_MAX_SEATS seats
+    of the movie session"""
+
+
+class SeatsUnavailable(Exception):
+    """Some places are sold or held by another customer, given as
+    (row, seat) for holds and (movie_session_id, row, seat) for orders"""
+
+    def __init__(self, places):
+        super().__init__(places)
+        self.places = places
+
+
+def _places_filter(places, **fields):
+    places_filter = Q()
+    for row, seat in places:
+        places_filter |= Q(row=row, seat=seat, **fields)
+    return places_filter
+
+
+def validate_tickets(tickets_data, error_to_raise, user_id=None):
+    """Validate all seats of an order against their halls in memory
+    and check them for conflicts with sold tickets and with seats held
+    by other users with two queries per movie session"""
+    errors = [{} for _ in tickets_data]
+    seats_by_session = defaultdict(dict)
+
+    for index, ticket_data in enumerate(tickets_data):
+        movie_session = ticket_data["movie_session"]
+        Ticket.validate_ticket(
+            ticket_data["row"],
+            ticket_data["seat"],
+            movie_session.cinema_hall,
+            error_to_raise,
+        )
+
+        seats = seats_by_session[movie_session.id]
+        place = (ticket_data["row"], ticket_data["seat"])
+        if place in seats:
+            errors[index] = {"non_field_errors": [SEAT_TAKEN_MESSAGE]}
+        else:
+            seats[place] = index
+
+    for movie_session_id, seats in seats_by_session.items():
+        places_filter = _places_filter(seats)
+
+        held_places = (
+            SeatHold.objects.filter(
+                places_filter,
+                movie_session_id=movie_session_id,
+                expires_at__gt=timezone.now(),
+            )
+            .exclude(user_id=user_id)
+            .order_by()
+            .values_list("row", "seat")
+        )
+        for place in held_places:
+            errors[seats[place]] = {"non_field_errors": [SEAT_HELD_MESSAGE]}
+
+        taken_places = Ticket.objects.filter(
+            places_filter, movie_session_id=movie_session_id
+        ).order_by().values_list("row", "seat")
+        for place in taken_places:
+            errors[seats[place]] = {"non_field_errors": [SEAT_TAKEN_MESSAGE]}
+
+    if any(errors):
+        raise error_to_raise(errors)
+
+
+def book_tickets(order, tickets_data, movie_sessions=None):
+    """Insert all tickets of an already validated order at once
+    and turn the holds of the customer on their seats into them"""
+    tickets = Ticket.objects.bulk_create(
+        [Ticket(order=order, **ticket_data) for ticket_data in tickets_data]
+    )
+    take_seats(tickets, movie_sessions)
+
+    holds_filter = Q()
+    for ticket in tickets:
+        holds_filter |= Q(
+            movie_session_id=ticket.movie_session_id,
+            row=ticket.row,
+            seat=ticket.seat,
+        )
+    SeatHold.objects.filter(holds_filter, user_id=order.user_id).delete()
+    return tickets
+
+
+def _lock_movie_sessions(movie_session_ids):
+    """Lock the movie sessions in id order, so transactions booking
+    several sessions can't deadlock each other"""
+    return {
+        movie_session.id: movie_session
+        for movie_session in MovieSession.objects.select_for_update()
+        .select_related("cinema_hall")
+        .filter(id__in=movie_session_ids)
+        .order_by("id")
+    }
+
+
+def _place_order(tickets_data, order_fields):
+    places_by_session = defaultdict(list)
+    for ticket_data in tickets_data:
+        places_by_session[ticket_data["movie_session"].id].append(
+            (ticket_data["row"], ticket_data["seat"])
+        )
+
+    # the customer's own holds don't conflict with the order
+    user_id = order_fields.get("user_id") or getattr(
+        order_fields.get("user"), "id", None
+    )
+
+    with immediate_atomic():
+        movie_sessions = _lock_movie_sessions(places_by_session)
+        unavailable = set()
+        for movie_session_id, places in places_by_session.items():
+            seat_map = movie_sessions[movie_session_id].seat_map
+            unavailable.update(
+                (movie_session_id, *place)
+                for place in places
+                if seat_map.is_taken(*place)
+            )
+            unavailable.update(
+                SeatHold.objects.filter(
+                    _places_filter(places),
+                    movie_session_id=movie_session_id,
+                    expires_at__gt=timezone.now(),
+                )
+                .exclude(user_id=user_id)
+                .order_by()
+                .values_list("movie_session", "row", "seat")
+            )
+        if unavailable:
+            raise SeatsUnavailable(sorted(unavailable))
+
+        order = Order.objects.create(**order_fields)
+        book_tickets(order, tickets_data, movie_sessions.values())
+        return order
+
+
+def place_order(tickets_data, **order_fields):
+    """Create an order with its tickets while holding row locks of their
+    movie sessions, re-checking the seats under the locks.
+
+    Transactions that still collide, on the unique constraint of tickets
+    or on a locked SQLite database, are retried up to
+    ORDER_CREATE_ATTEMPTS times with jittered exponential backoff.
+    Raises SeatsUnavailable with the places sold or held by others.
+    """
+    for attempt in range(settings.ORDER_CREATE_ATTEMPTS):
+        try:
+            return _place_order(tickets_data, order_fields)
+        except (IntegrityError, OperationalError):
+            if attempt == settings.ORDER_CREATE_ATTEMPTS - 1:
+                raise
+        time.sleep(
+            random.uniform(0, settings.ORDER_CREATE_BACKOFF * 2**attempt)
+        )
+
+
+def hold_seats(movie_session_id, user_id, places):
+    """Hold the places of a movie session for the user for SEAT_HOLD_TTL
+    seconds, renewing holds the user already has on them, but never
+    past SEAT_HOLD_MAX_LIFETIME seconds since a place was first held.
+
+    Raises SeatsUnavailable with the places sold or held by others and
+    SeatHoldLimitExceeded when the user would hold more than
+    SEAT_HOLD_MAX_SEATS seats of the session.
+    """
+    now = timezone.now()
+    with immediate_atomic():
+        # holds of a session are placed one at a time
+        movie_session = (
+            MovieSession.objects.select_for_update()
+            .select_related("cinema_hall")
+            .get(id=movie_session_id)
+        )
+        SeatHold.objects.filter(expires_at__lte=now).delete()
+
+        seat_map = movie_session.seat_map
+        unavailable = {place for place in places if seat_map.is_taken(*place)}
+        unavailable.update(
+            SeatHold.objects.filter(
+                _places_filter(places), movie_session_id=movie_session_id
+            )
+            .exclude(user_id=user_id)
+            .values_list("row", "seat")
+        )
+        if unavailable:
+            raise SeatsUnavailable(sorted(unavailable))
+
+        own_holds = SeatHold.objects.filter(
+            movie_session_id=movie_session_id, user_id=user_id
+        )
+        other_held = own_holds.exclude(_places_filter(places)).count()
+        if other_held + len(places) > settings.SEAT_HOLD_MAX_SEATS:
+            raise SeatHoldLimitExceeded(
+                f"At most {settings.SEAT_HOLD_MAX_SEATS} seats "
+                "of a movie session can be held at once."
+            )
+
+        renewed = own_holds.filter(_places_filter(places))
+        held_since = {
+            (row, seat): since
+            for row, seat, since in renewed.values_list(
+                "row", "seat", "held_since"
+            )
+        }
+        renewed.delete()
+        holds = []
+        for row, seat in places:
+            since = held_since.get((row, seat), now)
+            holds.append(
+                SeatHold(
+                    movie_session_id=movie_session_id,
+                    user_id=user_id,
+                    row=row,
+                    seat=seat,
+                    held_since=since,
+                    expires_at=min(
+                        now + timedelta(seconds=settings.SEAT_HOLD_TTL),
+                        since
+                        + timedelta(seconds=settings.SEAT_HOLD_MAX_LIFETIME),
+                    ),
+                )
+            )
+        return SeatHold.objects.bulk_create(holds)
+
+
+def release_holds(movie_session_id, user_id):
+    """Release all seats of the movie session held by the user"""
+    SeatHold.objects.filter(
+        movie_session_id=movie_session_id, user_id=user_id
+    ).delete()
+
+
+def _update_seat_maps(tickets, update, movie_sessions=None):
+    places_by_session = defaultdict(list)
+    for ticket in tickets:
+        places_by_session[ticket.movie_session_id].append(
+            (ticket.row, ticket.seat)
+        )
+
+    with transaction.atomic(savepoint=False):
+        if movie_sessions is None:
+            movie_sessions = _lock_movie_sessions(places_by_session).values()
+        for movie_session in movie_sessions:
+            seat_map = movie_session.seat_map
+            for row, seat in places_by_session[movie_session.id]:
+                update(seat_map, row, seat)
+            movie_session.taken_seats = seat_map.to_bytes()
+            movie_session.tickets_sold = seat_map.taken_count
+
+        MovieSession.objects.bulk_update(
+            movie_sessions, ["taken_seats", "tickets_sold"]
+        )
+
+
+def take_seats(tickets, movie_sessions=None):
+    """Mark places of the tickets as taken in their session seat maps,
+    locking the sessions unless they are given already locked"""
+    _update_seat_maps(tickets, SeatMap.take, movie_sessions)
+
+
+def release_seats(tickets):
+    """Mark places of the tickets as free in their session seat maps"""
+    _update_seat_maps(tickets, SeatMap.release)
+
+
+def rebuild_seat_maps(movie_session_ids):
+    """Recompute the seat maps and sold tickets counters of the movie
+    sessions from their tickets, with the dimensions of their current
+    halls, locking the sessions. Returns the updated sessions by id."""
+    places_by_session = defaultdict(list)
+    with transaction.atomic(savepoint=False):
+        movie_sessions = _lock_movie_sessions(movie_session_ids)
+        for movie_session_id, row, seat in (
+            Ticket.objects.filter(movie_session_id__in=movie_sessions)
+            .order_by()
+            .values_list("movie_session_id", "row", "seat")
+        ):
+            places_by_session[movie_session_id].append((row, seat))
+
+        for movie_session in movie_sessions.values():
+            seat_map = SeatMap.from_places(
+                movie_session.cinema_hall.rows,
+                movie_session.cinema_hall.seats_in_row,
+                places_by_session[movie_session.id],
+            )
+            movie_session.taken_seats = seat_map.to_bytes()
+            movie_session.tickets_sold = seat_map.taken_count
+
+        MovieSession.objects.bulk_update(
+            movie_sessions.values(), ["taken_seats", "tickets_sold"]
+        )
+    return movie_sessions
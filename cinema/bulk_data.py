@@ -0,0 +1,302 @@
+"""
+Bulk import and export of the cinema and user apps in the fixture
+format of loaddata and dumpdata, as a JSON array or one object per line.
+
+Objects are parsed from the stream one at a time and inserted with
+bulk_create in batches, models whose foreign keys others point to
+first, instead of being saved one by one. Tickets are validated against
+their halls a batch at a time, and the seat maps, the search index and
+the catalog cache are brought up to date once at the end.
+"""
+
+import json
+import re
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Deserializer
+from django.db import connection, models
+from django.utils import timezone
+
+from cinema import cache, search
+from cinema.models import Movie, MovieSession, Ticket
+from cinema.seat_map import SeatMap
+
+APP_LABELS = ("user", "cinema")
+BATCH_SIZE = 2000
+READ_SIZE = 64 * 1024
+
+# recomputed from the tickets on import
+DERIVED_FIELDS = {MovieSession: ("taken_seats", "tickets_sold")}
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def dependency_order():
+    """Models of the cinema and user apps, each after the models
+    its foreign keys point to"""
+    models = [
+        model
+        for app_label in APP_LABELS
+        for model in apps.get_app_config(app_label).get_models()
+    ]
+    ordered = []
+
+    def visit(model):
+        if model in ordered or model not in models:
+            return
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model is not model:
+                visit(field.related_model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def read_objects(stream):
+    """Yield the objects of a JSON array, or of a stream of JSON objects
+    such as NDJSON, without reading the whole stream at once"""
+    decoder = json.JSONDecoder()
+    buffer, position, in_array = "", 0, None
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if position < len(buffer):
+            if in_array is None:
+                in_array = buffer[position] == "["
+                position += in_array
+                continue
+            if in_array and buffer[position] == "]":
+                return
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                # most likely an object cut at the end of the buffer
+                incomplete = error
+            else:
+                yield obj
+                continue
+
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            if position < len(buffer):
+                raise incomplete
+            return
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def make_datetimes_naive(model, objects):
+    """Dumps of time zone aware databases, like the bundled fixture,
+    hold aware datetimes the database can't store with USE_TZ off"""
+    if settings.USE_TZ:
+        return
+    names = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.DateTimeField)
+    ]
+    for obj in objects:
+        for name in names:
+            value = getattr(obj, name)
+            if value is not None and timezone.is_aware(value):
+                setattr(obj, name, timezone.make_naive(value))
+
+
+@contextmanager
+def dumped_auto_now(model):
+    """Keep the dumped values of auto_now fields, which bulk_create
+    stamps with the current time unlike the raw saves of loaddata.
+    Fields are shared by the whole process, only for commands."""
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """Insert deserialized fixture objects in batches per model.
+
+    A full batch is flushed together with the pending objects of every
+    model it depends on, so validation always sees the rows it refers
+    to. Run it in a transaction, foreign keys are checked at commit.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.models = dependency_order()
+        self.pending = {model: [] for model in self.models}
+        self.counts = Counter()
+        self.movie_ids = []
+        self.seat_maps = {}
+
+    def load(self, objects):
+        for deserialized in Deserializer(objects):
+            model = type(deserialized.object)
+            if model not in self.pending:
+                raise DeserializationError(
+                    f"{model._meta.label} is not a model of the "
+                    f"{' or '.join(APP_LABELS)} apps"
+                )
+            self.pending[model].append(deserialized)
+            if len(self.pending[model]) >= self.batch_size:
+                self.flush(model)
+
+    def flush(self, last_model=None):
+        for model in self.models:
+            if self.pending[model]:
+                self.create(model, self.pending[model])
+                self.pending[model] = []
+            if model is last_model:
+                return
+
+    def create(self, model, batch):
+        objects = [deserialized.object for deserialized in batch]
+        make_datetimes_naive(model, objects)
+        if model is Ticket:
+            self.take_seats(objects)
+        with dumped_auto_now(model):
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model._meta.label_lower] += len(objects)
+        if model is Movie:
+            self.movie_ids.extend(movie.pk for movie in objects)
+
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            rows = [
+                through(
+                    **{
+                        field.m2m_column_name(): deserialized.object.pk,
+                        field.m2m_reverse_name(): related_pk,
+                    }
+                )
+                for deserialized in batch
+                for related_pk in deserialized.m2m_data.get(field.name, ())
+            ]
+            if rows:
+                through.objects.bulk_create(rows, batch_size=self.batch_size)
+                self.counts[through._meta.label_lower] += len(rows)
+
+    def take_seats(self, tickets):
+        """Validate the places of the tickets against the halls of their
+        movie sessions, loading unseen sessions with one query, and mark
+        them in the seat maps saved at the end"""
+        unseen = {
+            ticket.movie_session_id for ticket in tickets
+        } - self.seat_maps.keys()
+        for movie_session_id, rows, seats_in_row, taken_seats in (
+            MovieSession.objects.filter(id__in=unseen).values_list(
+                "id",
+                "cinema_hall__rows",
+                "cinema_hall__seats_in_row",
+                "taken_seats",
+            )
+        ):
+            self.seat_maps[movie_session_id] = SeatMap(
+                rows, seats_in_row, taken_seats
+            )
+
+        for ticket in tickets:
+            seat_map = self.seat_maps.get(ticket.movie_session_id)
+            try:
+                if seat_map is None:
+                    raise ValidationError(
+                        f"movie session {ticket.movie_session_id} "
+                        "does not exist"
+                    )
+                # the seat map has the dimensions of the hall
+                Ticket.validate_ticket(
+                    ticket.row, ticket.seat, seat_map, ValidationError
+                )
+            except ValidationError as error:
+                raise ValidationError(
+                    f"Ticket {ticket.pk}: {'; '.join(error.messages)}"
+                )
+            seat_map.take(ticket.row, ticket.seat)
+
+    def save_seat_maps(self):
+        # one prepared statement, bulk_update builds a CASE per row
+        table, taken_seats, tickets_sold, pk = (
+            connection.ops.quote_name(name)
+            for name in (
+                MovieSession._meta.db_table,
+                MovieSession._meta.get_field("taken_seats").column,
+                MovieSession._meta.get_field("tickets_sold").column,
+                MovieSession._meta.pk.column,
+            )
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {table} SET {taken_seats} = %s, "
+                f"{tickets_sold} = %s WHERE {pk} = %s",
+                [
+                    (seat_map.to_bytes(), seat_map.taken_count, pk)
+                    for pk, seat_map in self.seat_maps.items()
+                ],
+            )
+
+    def finish(self):
+        """Flush what is left and update everything bulk_create skips:
+        seat maps, the search index, the catalog cache and sequences"""
+        self.flush()
+        self.save_seat_maps()
+        search.index_movies(self.movie_ids)
+        cache.invalidate("genres", "actors", "movies", "cinema_halls")
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), self.models
+            ):
+                cursor.execute(sql)
+        return self.counts
+
+
+def dump_objects(batch_size=BATCH_SIZE):
+    """Yield every object of the cinema and user apps as a fixture dict,
+    in dependency order and a batch of rows at a time"""
+    for model in dependency_order():
+        queryset = model._default_manager.order_by("pk")
+        many_to_many = [field.name for field in model._meta.many_to_many]
+        if many_to_many:
+            queryset = queryset.prefetch_related(*many_to_many)
+        rows = queryset.iterator(chunk_size=batch_size)
+        while chunk := list(islice(rows, batch_size)):
+            for obj in serializers.serialize("python", chunk):
+                for name in DERIVED_FIELDS.get(model, ()):
+                    del obj["fields"][name]
+                yield obj
+
+
+def write_objects(objects, stream, ndjson=False):
+    """Write the objects as NDJSON or as a JSON array loaddata reads,
+    returning the number of objects per model"""
+    counts = Counter()
+    separator = "[\n"
+    for obj in objects:
+        counts[obj["model"]] += 1
+        line = json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False)
+        if ndjson:
+            stream.write(line + "\n")
+        else:
+            stream.write(separator + line)
+            separator = ",\n"
+    if not ndjson:
+        stream.write("[]\n" if separator == "[\n" else "\n]\n")
+    return counts
@@ -0,0 +1,104 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.utils.http import http_date, urlencode
+from rest_framework import mixins, status
+from rest_framework.response import Response
+
+CATALOG_CACHE_ALIAS = "catalog"
+
+
+def catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f"catalog:{namespace}:version"
+
+
+def get_version(namespace):
+    """Return the time of the last change of the namespace,
+    every cached response is keyed on it"""
+    cache = catalog_cache()
+    cache.add(_version_key(namespace), time.time(), None)
+    return cache.get(_version_key(namespace))
+
+
+def invalidate(*namespaces):
+    """Make all cached responses of the namespaces stale"""
+    catalog_cache().set_many(
+        {_version_key(namespace): time.time() for namespace in namespaces},
+        None,
+    )
+
+
+def _user_role(user):
+    if user and user.is_staff:
+        return "staff"
+    if user and user.is_authenticated:
+        return "user"
+    return "anonymous"
+
+
+class CachedResponseMixin:
+    """Cache successful responses of a viewset action
+    in the catalog cache and answer If-None-Match with 304"""
+
+    cache_namespace = None
+
+    def get_cache_key(self, request, version):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        # responses hold absolute image and pagination URLs
+        url = f"{request.scheme}://{request.get_host()}{request.path}"
+        digest = hashlib.md5(
+            f"{url}?{query}:{_user_role(request.user)}".encode()
+        ).hexdigest()
+        return f"catalog:{self.cache_namespace}:{version}:{digest}"
+
+    @staticmethod
+    def _is_not_modified(request, etag):
+        # only the ETag tells versions apart, Last-Modified has whole
+        # seconds and two changes within one would get a stale 304 on
+        # If-Modified-Since
+        if_none_match = request.headers.get("If-None-Match", "")
+        return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        version = get_version(self.cache_namespace)
+        key = self.get_cache_key(request, version)
+        headers = {
+            "ETag": f'"{hashlib.md5(key.encode()).hexdigest()}"',
+            "Last-Modified": http_date(version),
+        }
+
+        if self._is_not_modified(request, headers["ETag"]):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+
+        data = catalog_cache().get(key)
+        if data is not None:
+            return Response(data, headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            catalog_cache().set(key, response.data)
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
+
+
+class CachedListModelMixin(CachedResponseMixin, mixins.ListModelMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveModelMixin(
+    CachedResponseMixin, mixins.RetrieveModelMixin
+):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
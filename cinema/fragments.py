@@ -0,0 +1,100 @@
+"""
+Pre-encoded representations of rarely changing catalog objects.
+
+Serializers using PreEncodedSerializerMixin represent every object
+only once per catalog namespace version. The representation is an
+EncodedDict: a plain dict to Python code, which FastJSONRenderer
+splices into responses as JSON encoded once, without re-encoding it.
+
+Representations live in the process memory and namespace versions in
+the catalog cache. Unless that cache is shared by all processes, a
+process that didn't handle a change keeps its representations until
+CATALOG_FRAGMENT_TTL expires.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from cinema.cache import get_version
+
+MAX_FRAGMENTS = 10000
+
+
+class EncodedDict(dict):
+    """Representation of an object which knows its JSON encoding"""
+
+    @cached_property
+    def encoded(self):
+        from cinema.renderers import FastJSONRenderer
+
+        return FastJSONRenderer().render(dict(self))
+
+
+class FragmentCache:
+    """Representations per namespace with a time to live, dropped
+    as soon as the namespace version changes"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._namespaces = {}
+
+    def get_or_set(self, namespace, version, key, represent):
+        with self._lock:
+            cached_version, fragments = self._namespaces.get(
+                namespace, (None, {})
+            )
+            if cached_version == version and key in fragments:
+                fragment, expires_at = fragments[key]
+                if expires_at > time.monotonic():
+                    return fragment
+
+        fragment = EncodedDict(represent())
+        with self._lock:
+            cached_version, fragments = self._namespaces.get(
+                namespace, (None, {})
+            )
+            if cached_version != version or len(fragments) >= self.max_size:
+                fragments = {}
+                self._namespaces[namespace] = (version, fragments)
+            fragments[key] = (fragment, time.monotonic() + self.ttl)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._namespaces.clear()
+
+
+fragment_cache = FragmentCache(
+    max_size=MAX_FRAGMENTS, ttl=settings.CATALOG_FRAGMENT_TTL
+)
+
+
+class PreEncodedSerializerMixin:
+    """Serializer mixin reusing the representation of an object until
+    its catalog namespace (`fragment_namespace`) is invalidated"""
+
+    fragment_namespace = None
+
+    def _namespace_version(self):
+        # looked up once per response, shared by nested serializers
+        versions = self.context.setdefault("fragment_versions", {})
+        if self.fragment_namespace not in versions:
+            versions[self.fragment_namespace] = get_version(
+                self.fragment_namespace
+            )
+        return versions[self.fragment_namespace]
+
+    def to_representation(self, instance):
+        return fragment_cache.get_or_set(
+            self.fragment_namespace,
+            self._namespace_version(),
+            (type(self), instance.pk),
+            lambda: super(PreEncodedSerializerMixin, self).to_representation(
+                instance
+            ),
+        )
@@ -0,0 +1,153 @@
+"""
+Renditions of uploaded movie images.
+
+After an image is uploaded, a pool of worker threads decodes it once
+with Pillow and stores every size of MOVIE_IMAGE_RENDITIONS in every
+format of MOVIE_IMAGE_FORMATS next to the original. Their names are
+kept in Movie.image_renditions as {rendition: {format: name}}. Lists
+serve the thumbnail, the original is only served on detail.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from cinema import cache
+from cinema.models import Movie
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIRECTORY = "uploads/movies/renditions/"
+LIST_RENDITION = ("thumbnail", "webp")
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True},
+}
+
+_executor = None
+
+
+def _image_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS,
+            thread_name_prefix="image-processing",
+        )
+    return _executor
+
+
+def rendition_name(image_name, rendition, image_format):
+    stem, _ = os.path.splitext(os.path.basename(image_name))
+    return os.path.join(
+        RENDITIONS_DIRECTORY, f"{stem}-{rendition}.{image_format}"
+    )
+
+
+def file_url(storage, name, request=None):
+    """What serializers.ImageField returns for a stored file"""
+    if not name:
+        return None
+    url = storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def rendition_url(storage, renditions, request=None, rendition=None):
+    rendition, image_format = rendition or LIST_RENDITION
+    return file_url(
+        storage, renditions.get(rendition, {}).get(image_format), request
+    )
+
+
+def _encode(image, image_format):
+    if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    content = BytesIO()
+    image.save(content, **SAVE_OPTIONS[image_format])
+    return content.getvalue()
+
+
+def render_renditions(source):
+    """Yield (rendition, format, content) of every configured size
+    and format of the image file"""
+    sizes = sorted(
+        settings.MOVIE_IMAGE_RENDITIONS.items(),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    with Image.open(source) as original:
+        # let JPEG decode at a reduced scale already
+        original.draft("RGB", sizes[0][1])
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    # downscale from the previous, larger rendition
+    for rendition, size in sizes:
+        image = image.copy()
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        for image_format in settings.MOVIE_IMAGE_FORMATS:
+            yield rendition, image_format, _encode(image, image_format)
+
+
+def release_files(image_name, renditions):
+    """Drop the references of a movie to its image and renditions"""
+    Movie._meta.get_field("image").storage.release(
+        image_name,
+        *(name for names in renditions.values() for name in names.values()),
+    )
+
+
+def generate_renditions(movie_id, image_name):
+    """Store the renditions of the image and record them on the movie
+    if it still has that image"""
+    storage = Movie._meta.get_field("image").storage
+    renditions = {}
+    with storage.open(image_name) as source:
+        for rendition, image_format, content in render_renditions(source):
+            name = storage.save(
+                rendition_name(image_name, rendition, image_format),
+                ContentFile(content),
+            )
+            renditions.setdefault(rendition, {})[image_format] = name
+
+    with transaction.atomic():
+        movie = (
+            Movie.objects.select_for_update()
+            .filter(id=movie_id, image=image_name)
+            .only("image_renditions")
+            .first()
+        )
+        if movie is None:
+            release_files(None, renditions)
+            return renditions
+
+        release_files(None, movie.image_renditions)
+        Movie.objects.filter(id=movie_id).update(image_renditions=renditions)
+    cache.invalidate("movies")
+    return renditions
+
+
+def _process(movie_id, image_name):
+    try:
+        generate_renditions(movie_id, image_name)
+    except Exception:
+        logger.exception("Cannot render image %s", image_name)
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(movie):
+    """Render the movie image in the worker pool once
+    the current transaction commits"""
+    movie_id, image_name = movie.id, movie.image.name
+    transaction.on_commit(
+        lambda: _image_executor().submit(_process, movie_id, image_name)
+    )
@@ -0,0 +1,181 @@
+import json
+import os
+import platform
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from cinema import benchmark
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Seed a synthetic dataset into a throwaway test database, "
+        "drive every API endpoint and report latency percentiles, "
+        "queries per request and peak memory as JSON"
+    )
+
+    def add_arguments(self, parser):
+        for name, default in [
+            ("movies", 1000),
+            ("movie-sessions", 5000),
+            ("users", 1000),
+            ("orders", 10000),
+            ("tickets", 50000),
+            ("genres", 20),
+            ("actors", 500),
+            ("cinema-halls", 20),
+        ]:
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Number of {name.replace('-', ' ')} to generate",
+            )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Requests per endpoint",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="Only run endpoints with this name prefix, e.g. movies",
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep the catalog response cache between requests",
+        )
+        parser.add_argument(
+            "--async-load",
+            action="store_true",
+            help="Also compare sync and async catalog endpoints under "
+            "concurrent load",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            action="append",
+            help="Concurrent requests of the async load test, repeatable",
+        )
+        parser.add_argument(
+            "--serializers",
+            action="store_true",
+            help="Also compare CPU time per row of the compiled and DRF "
+            "list serializers",
+        )
+        parser.add_argument(
+            "--renderers",
+            action="store_true",
+            help="Also compare JSON renderers on detail and list payloads",
+        )
+        parser.add_argument(
+            "--sqlite-modes",
+            action="store_true",
+            help="Also compare concurrent reads and writes on SQLite files "
+            "with the default and the tuned pragmas",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the benchmark database and its dataset, on SQLite "
+            "kept in benchmark.sqlite3 next to the database",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed of the dataset"
+        )
+        parser.add_argument(
+            "--output", help="Write the report to this file, not stdout"
+        )
+
+    def handle(self, *args, **options):
+        # measure requests as production serves them, without debug
+        # query logging and the debug toolbar
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        if connection.vendor == "sqlite" and not test_settings["NAME"]:
+            # the default in-memory test database can't be kept
+            test_settings["NAME"] = os.path.join(
+                os.path.dirname(old_name), "benchmark.sqlite3"
+            )
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            with override_settings(
+                MIDDLEWARE=[
+                    middleware
+                    for middleware in settings.MIDDLEWARE
+                    if not middleware.startswith("debug_toolbar.")
+                ]
+            ):
+                report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def run(self, options):
+        if options["keepdb"] and benchmark.Movie.objects.exists():
+            dataset = None
+        else:
+            dataset = benchmark.seed_dataset(
+                movies=options["movies"],
+                movie_sessions=options["movie_sessions"],
+                users=options["users"],
+                orders=options["orders"],
+                tickets=options["tickets"],
+                genres=options["genres"],
+                actors=options["actors"],
+                cinema_halls=options["cinema_halls"],
+                seed=options["seed"],
+            )
+
+        report = {
+            "started_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "repeat": options["repeat"],
+            "warm_cache": options["warm_cache"],
+            "dataset": dataset,
+            "endpoints": benchmark.run_endpoints(
+                repeat=options["repeat"],
+                warm_cache=options["warm_cache"],
+                only=options["endpoints"],
+            ),
+        }
+        if options["async_load"]:
+            report["async_load"] = benchmark.run_async_load(
+                concurrency=options["concurrency"] or (1, 10, 50),
+                requests=options["repeat"],
+                only=options["endpoints"],
+            )
+        if options["serializers"]:
+            report["list_serializers"] = benchmark.compare_list_serializers()
+        if options["renderers"]:
+            report["renderers"] = benchmark.compare_renderers()
+        if options["sqlite_modes"]:
+            report["sqlite_modes"] = benchmark.compare_sqlite_modes()
+        return report
@@ -0,0 +1,49 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from cinema.bulk_data import BATCH_SIZE, dump_objects, write_objects
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Stream every object of the cinema and user apps in dependency "
+        "order as a JSON array loaddata reads, or as NDJSON, "
+        "and report objects per second"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=("json", "ndjson"),
+            default="json",
+            help="JSON array or one object per line",
+        )
+        parser.add_argument(
+            "--output", help="Write to this file, not stdout"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows read and serialized at once",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        objects = dump_objects(batch_size=options["batch_size"])
+        ndjson = options["format"] == "ndjson"
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                counts = write_objects(objects, output, ndjson=ndjson)
+        else:
+            counts = write_objects(objects, self.stdout, ndjson=ndjson)
+        elapsed = time.perf_counter() - started
+
+        total = sum(counts.values())
+        # the report must not end up in a dump written to stdout
+        sys.stderr.write(
+            f"Dumped {total} objects in {elapsed:.2f}s "
+            f"({total / (elapsed or 1):.0f} objects/s)\n"
+        )
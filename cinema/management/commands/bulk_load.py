@@ -0,0 +1,60 @@
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError, transaction
+
+from cinema.bulk_data import BATCH_SIZE, BulkLoader, read_objects
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Load fixtures or bulk_dump files of the cinema and user apps, "
+        "JSON arrays or NDJSON, with batched inserts instead of saving "
+        "objects one by one, and report rows per second"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="+", help="Fixture files, - reads stdin"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Objects per model inserted at once",
+        )
+
+    def handle(self, *args, **options):
+        loader = BulkLoader(batch_size=options["batch_size"])
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for path in options["paths"]:
+                    if path == "-":
+                        loader.load(read_objects(sys.stdin))
+                        continue
+                    with open(path, encoding="utf-8") as fixture:
+                        loader.load(read_objects(fixture))
+                counts = loader.finish()
+        except (
+            OSError,
+            ValueError,
+            ValidationError,
+            DeserializationError,
+            IntegrityError,
+        ) as error:
+            raise CommandError(f"Nothing was loaded: {error}")
+        elapsed = time.perf_counter() - started
+
+        for label, rows in counts.items():
+            self.stdout.write(f"{label}: {rows} rows")
+        total = sum(counts.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {total} rows in {elapsed:.2f}s "
+                f"({total / (elapsed or 1):.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from cinema.booking import rebuild_seat_maps
+from cinema.models import MovieSession
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Recompute sold tickets counters and seat maps of movie sessions "
+        "that drifted from their tickets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every movie session, not only drifted counters",
+        )
+
+    def handle(self, *args, **options):
+        movie_sessions = MovieSession.objects.order_by("id")
+        if not options["all"]:
+            movie_sessions = movie_sessions.annotate(
+                tickets_count=Count("tickets")
+            ).exclude(tickets_sold=F("tickets_count"))
+
+        fixed = 0
+        for movie_session in movie_sessions.iterator():
+            rebuilt = rebuild_seat_maps([movie_session.id])[movie_session.id]
+            if rebuilt.tickets_sold != movie_session.tickets_sold:
+                fixed += 1
+                self.stdout.write(
+                    f"{rebuilt}: {movie_session.tickets_sold} -> "
+                    f"{rebuilt.tickets_sold} tickets sold"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {fixed} movie session(s)")
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from cinema import images
+from cinema.models import Movie
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Render the configured sizes and formats of movie images "
+        "uploaded before the image pipeline or whose rendering failed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Render every movie image, not only the missing ones",
+        )
+
+    def handle(self, *args, **options):
+        movies = Movie.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            movies = movies.filter(image_renditions={})
+
+        rendered = 0
+        for movie_id, image_name in movies.values_list(
+            "id", "image"
+        ).iterator():
+            try:
+                images.generate_renditions(movie_id, image_name)
+            except OSError as error:
+                self.stderr.write(f"{image_name}: {error}")
+                continue
+            rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {rendered} movie image(s)")
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from cinema.seat_map import SeatMap
+
+
+def fill_taken_seats(apps, schema_editor):
+    MovieSession = apps.get_model("cinema", "MovieSession")
+    for movie_session in MovieSession.objects.select_related("cinema_hall"):
+        movie_session.taken_seats = SeatMap.from_places(
+            movie_session.cinema_hall.rows,
+            movie_session.cinema_hall.seats_in_row,
+            movie_session.tickets.values_list("row", "seat"),
+        ).to_bytes()
+        movie_session.save(update_fields=["taken_seats"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="moviesession",
+            name="taken_seats",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(fill_taken_seats, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="moviesession",
+            name="cinema_hall",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="movie_sessions", to="cinema.cinemahall"),
+        ),
+        migrations.AlterField(
+            model_name="moviesession",
+            name="movie",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="movie_sessions", to="cinema.movie"),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="user",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="orders", to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0005_moviesession_tickets_sold"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["title", "id"], name="movie_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="moviesession",
+            index=models.Index(fields=["show_time"], name="moviesession_show_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="moviesession",
+            index=models.Index(fields=["movie", "show_time"], name="moviesession_movie_time_idx"),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX movie_genres_genre_movie_idx "
+            "ON cinema_movie_genres (genre_id, movie_id)",
+            "DROP INDEX movie_genres_genre_movie_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX movie_actors_actor_movie_idx "
+            "ON cinema_movie_actors (actor_id, movie_id)",
+            "DROP INDEX movie_actors_actor_movie_idx",
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["user", "-created_at", "-id"], name="order_user_created_at_idx"),
+        ),
+    ]
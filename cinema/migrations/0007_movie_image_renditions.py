@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0006_api_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="image_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:34
+
+import cinema.models
+import cinema.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0007_movie_image_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                ("name", models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ("references", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="movie",
+            name="image",
+            field=models.ImageField(null=True, storage=cinema.storage.movie_image_storage, upload_to=cinema.models.movie_image_file_path),
+        ),
+    ]
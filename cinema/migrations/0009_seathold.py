@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0008_stored_file"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatHold",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("row", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                ("movie_session", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="seat_holds", to="cinema.moviesession")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="seat_holds", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["row", "seat"],
+                "unique_together": {("movie_session", "row", "seat")},
+            },
+        ),
+    ]
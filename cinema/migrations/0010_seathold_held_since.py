@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0009_seathold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seathold",
+            name="held_since",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -3,9 +3,14 @@ import uuid
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 
+from cinema.seat_map import SeatMap
+from cinema.storage import movie_image_storage
+
 
 class CinemaHall(models.Model):
     name = models.CharField(max_length=255)
@@ -16,6 +21,15 @@ class CinemaHall(models.Model):
     def capacity(self) -> int:
         return self.rows * self.seats_in_row
 
+    def clean(self):
+        if self.pk and Ticket.outside_hall(
+            Ticket.objects.filter(movie_session__cinema_hall_id=self.pk), self
+        ).exists():
+            raise ValidationError(
+                "Sold tickets of the hall's movie sessions "
+                "don't fit into the new size."
+            )
+
     def __str__(self):
         return self.name
 
@@ -39,6 +53,16 @@ class Actor(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class StoredFile(models.Model):
+    """Reference count of a file of the content-addressed storage"""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
 def movie_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
     filename = f"{slugify(instance.title)}-{uuid.uuid4()}{extension}"
@@ -52,10 +76,16 @@ class Movie(models.Model):
     duration = models.IntegerField()
     genres = models.ManyToManyField(Genre)
     actors = models.ManyToManyField(Actor)
-    image = models.ImageField(null=True, upload_to=movie_image_file_path)
+    image = models.ImageField(
+        null=True, upload_to=movie_image_file_path, storage=movie_image_storage
+    )
+    image_renditions = models.JSONField(default=dict, editable=False)
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="movie_title_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -73,14 +103,78 @@ class MovieSession(models.Model):
         on_delete=models.CASCADE,
         related_name="movie_sessions"
     )
+    taken_seats = models.BinaryField(default=b"", editable=False)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["show_time"], name="moviesession_show_time_idx"
+            ),
+            models.Index(
+                fields=["movie", "show_time"],
+                name="moviesession_movie_time_idx",
+            ),
+        ]
+
+    @property
+    def seat_map(self) -> SeatMap:
+        return SeatMap(
+            self.cinema_hall.rows,
+            self.cinema_hall.seats_in_row,
+            self.taken_seats,
+        )
+
+    @property
+    def tickets_available(self) -> int:
+        return self.cinema_hall.capacity - self.tickets_sold
+
+    def clean(self):
+        if self.pk and Ticket.outside_hall(
+            self.tickets.all(), self.cinema_hall
+        ).exists():
+            raise ValidationError(
+                {
+                    "cinema_hall": "Sold tickets of the movie session "
+                    "don't fit into this cinema hall."
+                }
+            )
 
     def __str__(self):
         return self.movie.title + " " + str(self.show_time)
 
 
+class SeatHold(models.Model):
+    """A seat reserved for a user until it expires or is ordered"""
+
+    movie_session = models.ForeignKey(
+        MovieSession,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    # renewals extend expires_at up to SEAT_HOLD_MAX_LIFETIME from here
+    held_since = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("movie_session", "row", "seat")
+        ordering = ["row", "seat"]
+
+    def __str__(self):
+        return (
+            f"{str(self.movie_session)} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -94,6 +188,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_at_idx",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -127,6 +227,14 @@ class Ticket(models.Model):
                     }
                 )
 
+    @staticmethod
+    def outside_hall(tickets, cinema_hall):
+        """Tickets of the queryset with places out of the cinema hall"""
+        return tickets.filter(
+            Q(row__gt=cinema_hall.rows)
+            | Q(seat__gt=cinema_hall.seats_in_row)
+        )
+
     def clean(self):
         Ticket.validate_ticket(
             self.row,
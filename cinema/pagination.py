@@ -0,0 +1,205 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination on the queryset or model ordering
+    with an id tiebreaker.
+
+    The cursor keeps the values of all ordering fields of the edge row,
+    so every page is a plain index range scan without OFFSET or COUNT.
+    When `optional` is set, requests without a cursor or a page size
+    are left unpaginated to keep existing clients working.
+    """
+
+    page_size = 20
+    optional = False
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        tiebreaker = "-id" if ordering and ordering[0][0] == "-" else "id"
+        if tiebreaker.lstrip("-") not in [
+            field.lstrip("-") for field in ordering
+        ]:
+            ordering.append(tiebreaker)
+        return tuple(ordering)
+
+    def wants_pagination(self, request):
+        return not self.optional or any(
+            param in request.query_params
+            for param in (self.cursor_query_param, self.page_size_query_param)
+            if param
+        )
+
+    def _keyset_filter(self, position, reverse):
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = f"{name}__{'lt' if descending else 'gt'}"
+            equal = {
+                previous.lstrip("-"): value
+                for previous, value in zip(self.ordering[:index], position)
+            }
+            conditions.append(Q(**equal, **{lookup: position[index]}))
+        return reduce(or_, conditions)
+
+    def _decode_position(self, queryset, position):
+        """Values of the ordering fields in the cursor, a tampered cursor
+        is a 404 like any other invalid cursor"""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(
+                self.ordering
+            ):
+                raise ValueError("Cursor position doesn't match the ordering")
+            if not all(
+                isinstance(value, (str, int, float)) for value in values
+            ):
+                raise ValueError("Cursor position holds a non-scalar value")
+            return [
+                value
+                if field.lstrip("-") in queryset.query.annotations
+                else queryset.model._meta.get_field(
+                    field.lstrip("-")
+                ).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, IndexError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode_position(self, instance):
+        return json.dumps(
+            [
+                getattr(instance, field.lstrip("-"))
+                for field in self.ordering
+            ],
+            default=str,
+        )
+
+    def _page_queryset(self, queryset, request, view):
+        """The queryset of the requested page plus one row telling
+        whether another page follows, None when not paginating"""
+        if not self.wants_pagination(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[
+                    field[1:] if field.startswith("-") else f"-{field}"
+                    for field in self.ordering
+                ]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor and self.cursor.position:
+            position = self._decode_position(queryset, self.cursor.position)
+            queryset = queryset.filter(
+                self._keyset_filter(position, reverse)
+            )
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, results):
+        reverse = bool(self.cursor and self.cursor.reverse)
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = bool(self.cursor and self.cursor.position)
+
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() with the async ORM"""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([obj async for obj in queryset])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=False,
+                position=self._encode_position(self.page[-1]),
+            )
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=True,
+                position=self._encode_position(self.page[0]),
+            )
+        )
+
+
+class CatalogPagination(KeysetPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    optional = True
+
+
+class PageNumberOrKeysetPagination(KeysetPagination):
+    """Keyset pagination once a cursor is requested, an empty `cursor`
+    for the first page, and page numbers with a count otherwise to keep
+    clients of the page-number pagination working"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_pagination = None
+        if self.cursor_query_param in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_number_pagination = PageNumberPagination()
+        self.page_number_pagination.page_size = self.page_size
+        self.page_number_pagination.page_size_query_param = (
+            self.page_size_query_param
+        )
+        self.page_number_pagination.max_page_size = self.max_page_size
+        return self.page_number_pagination.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination:
+            return self.page_number_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,90 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from cinema.fragments import EncodedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+def _orjson_default(obj):
+    if isinstance(obj, EncodedDict):
+        return orjson.Fragment(obj.encoded)
+    # subclasses of builtins are passed through to find EncodedDict
+    for base in (dict, list, str, int):
+        if isinstance(obj, base):
+            return base(obj)
+    return _encoder.default(obj)
+
+
+if orjson is None:
+    _ORJSON_OPTIONS = 0
+elif hasattr(orjson, "Fragment"):
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+else:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson or ujson when installed.
+
+    The output is the same as JSONRenderer's compact output, pre-encoded
+    EncodedDict fragments are spliced in as they are with orjson.
+    Indented output is left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if orjson is not None:
+            try:
+                ret = orjson.dumps(
+                    data, default=_orjson_default, option=_ORJSON_OPTIONS
+                )
+            except TypeError:
+                # e.g. integers over 64 bits or lazy strings as keys
+                return super().render(
+                    data, accepted_media_type, renderer_context
+                )
+        elif ujson is not None:
+            ret = ujson.dumps(
+                data,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                default=_encoder.default,
+            ).encode()
+        else:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # same as JSONRenderer, these are invalid in JavaScript strings
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """Newline delimited JSON, one compact object per line"""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"  # noqa: VNE003
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, list):
+            return b"".join(self.render(item) for item in data)
+        return super().render(data) + b"\n"
@@ -0,0 +1,128 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "cinema_movie_search"
+SEARCH_COLUMNS = ("title", "description", "genres", "actors")
+
+DOCUMENTS_SQL = """
+    SELECT
+        movie.id,
+        movie.title,
+        movie.description,
+        (
+            SELECT group_concat(genre.name, ' ')
+            FROM cinema_movie_genres AS movie_genre
+            JOIN cinema_genre AS genre ON genre.id = movie_genre.genre_id
+            WHERE movie_genre.movie_id = movie.id
+        ),
+        (
+            SELECT group_concat(
+                actor.first_name || ' ' || actor.last_name, ' '
+            )
+            FROM cinema_movie_actors AS movie_actor
+            JOIN cinema_actor AS actor ON actor.id = movie_actor.actor_id
+            WHERE movie_actor.movie_id = movie.id
+        )
+    FROM cinema_movie AS movie
+"""
+INDEX_BATCH_SIZE = 500
+
+
+def is_supported():
+    """Full-text index is kept in an SQLite FTS5 table"""
+    return connection.vendor == "sqlite"
+
+
+def create_index(schema_editor):
+    """Create and fill the index, used by the migration"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        f"{', '.join(SEARCH_COLUMNS)}, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        f"{DOCUMENTS_SQL}"
+    )
+
+
+def drop_index(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def _batches(movie_ids):
+    movie_ids = list(movie_ids)
+    for start in range(0, len(movie_ids), INDEX_BATCH_SIZE):
+        yield movie_ids[start:start + INDEX_BATCH_SIZE]
+
+
+def remove_movies(movie_ids):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for batch in _batches(movie_ids):
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} "
+                f"WHERE rowid IN ({', '.join(['%s'] * len(batch))})",
+                batch,
+            )
+
+
+def index_movies(movie_ids):
+    """Replace the indexed documents of the movies with their current data"""
+    if not is_supported():
+        return
+    remove_movies(movie_ids)
+    with connection.cursor() as cursor:
+        for batch in _batches(movie_ids):
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} "
+                f"(rowid, {', '.join(SEARCH_COLUMNS)}) {DOCUMENTS_SQL} "
+                f"WHERE movie.id IN ({', '.join(['%s'] * len(batch))})",
+                batch,
+            )
+
+
+def _match_expression(query):
+    """Turn user input into an FTS5 query matching every word by prefix"""
+    return " AND ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+
+def _matches(expression):
+    return RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+        (expression,),
+    )
+
+
+def search(queryset, query):
+    """Movies matching the query in title, description, genre names
+    or actor full names, annotated with `search_rank` (lower is better)
+    and ordered by it on SQLite, unranked substring matches elsewhere"""
+    expression = _match_expression(query)
+    if not is_supported() or not expression:
+        return queryset.filter(
+            Q(title__icontains=query)
+            | Q(description__icontains=query)
+            | Q(genres__name__icontains=query)
+            | Q(actors__first_name__icontains=query)
+            | Q(actors__last_name__icontains=query)
+        )
+
+    rank = RawSQL(
+        f"SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+        "AND rowid = cinema_movie.id",
+        (expression,),
+    )
+    return (
+        queryset.filter(id__in=_matches(expression))
+        .annotate(search_rank=rank)
+        .order_by("search_rank", "id")
+    )
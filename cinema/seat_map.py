@@ -0,0 +1,55 @@
+import base64
+
+
+class SeatMap:
+    """Bitset of taken places of a movie session,
+    one bit per seat of the cinema hall in row-major order"""
+
+    def __init__(self, rows, seats_in_row, data=b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self._bits = bytearray(bytes(data or b"")[:size].ljust(size, b"\0"))
+
+    @classmethod
+    def from_places(cls, rows, seats_in_row, places):
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in places:
+            seat_map.take(row, seat)
+        return seat_map
+
+    def _position(self, row, seat):
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index // 8, 1 << (index % 8)
+
+    def is_taken(self, row, seat):
+        byte, mask = self._position(row, seat)
+        return bool(self._bits[byte] & mask)
+
+    def take(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def release(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    @property
+    def taken_count(self):
+        return int.from_bytes(self._bits, "little").bit_count()
+
+    def taken_places(self):
+        """Yield taken (row, seat) pairs ordered by row and seat"""
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def to_bytes(self):
+        return bytes(self._bits)
+
+    def to_base64(self):
+        return base64.b64encode(self._bits).decode()
@@ -1,7 +1,13 @@
-from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from cinema import images
+from cinema.booking import validate_tickets, place_order
+from cinema.fragments import PreEncodedSerializerMixin
+from cinema.list_serializers import (
+    CompiledMovieListSerializer,
+    CompiledMovieSessionListSerializer,
+)
 from cinema.models import (
     Genre,
     Actor,
@@ -13,19 +19,31 @@ from cinema.models import (
 )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(
+    PreEncodedSerializerMixin, serializers.ModelSerializer
+):
+    fragment_namespace = "genres"
+
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(
+    PreEncodedSerializerMixin, serializers.ModelSerializer
+):
+    fragment_namespace = "actors"
+
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class CinemaHallSerializer(serializers.ModelSerializer):
+class CinemaHallSerializer(
+    PreEncodedSerializerMixin, serializers.ModelSerializer
+):
+    fragment_namespace = "cinema_halls"
+
     class Meta:
         model = CinemaHall
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
@@ -44,6 +62,38 @@ class MovieSerializer(serializers.ModelSerializer):
         )
 
 
+class ImageRenditionField(serializers.ReadOnlyField):
+    """URL of a rendition of the movie image, `source` must point
+    to the movie image_renditions"""
+
+    def __init__(self, rendition=None, **kwargs):
+        self.rendition = rendition
+        super().__init__(**kwargs)
+
+    def to_representation(self, renditions):
+        return images.rendition_url(
+            Movie._meta.get_field("image").storage,
+            renditions,
+            self.context.get("request"),
+            self.rendition,
+        )
+
+
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """URLs of every rendition of the movie image"""
+
+    def to_representation(self, renditions):
+        storage = Movie._meta.get_field("image").storage
+        request = self.context.get("request")
+        return {
+            rendition: {
+                image_format: images.file_url(storage, name, request)
+                for image_format, name in names.items()
+            }
+            for rendition, names in renditions.items()
+        }
+
+
 class MovieListSerializer(serializers.ModelSerializer):
 
     genres = serializers.SlugRelatedField(
@@ -54,6 +104,8 @@ class MovieListSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="full_name",
     )
+    # the thumbnail, the original image is only served on detail
+    image = ImageRenditionField(source="image_renditions")
 
     class Meta:
         model = Movie
@@ -66,11 +118,13 @@ class MovieListSerializer(serializers.ModelSerializer):
             "actors",
             "image",
         )
+        list_serializer_class = CompiledMovieListSerializer
 
 
 class MovieDetailSerializer(serializers.ModelSerializer):
     genres = GenreSerializer(many=True, read_only=True)
     actors = ActorSerializer(many=True, read_only=True)
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Movie
@@ -82,6 +136,7 @@ class MovieDetailSerializer(serializers.ModelSerializer):
             "genres",
             "actors",
             "image",
+            "image_renditions",
         )
 
 
@@ -96,10 +151,20 @@ class MovieSessionSerializer(serializers.ModelSerializer):
         model = MovieSession
         fields = ("id", "show_time", "movie", "cinema_hall")
 
+    def validate_cinema_hall(self, cinema_hall):
+        if self.instance and Ticket.outside_hall(
+            self.instance.tickets.all(), cinema_hall
+        ).exists():
+            raise ValidationError(
+                "Sold tickets of the movie session "
+                "don't fit into this cinema hall."
+            )
+        return cinema_hall
+
 
 class MovieSessionListSerializer(MovieSessionSerializer):
     movie_title = serializers.CharField(source="movie.title", read_only=True)
-    movie_image = serializers.ImageField(source="movie.image", read_only=True)
+    movie_image = ImageRenditionField(source="movie.image_renditions")
     cinema_hall_name = serializers.CharField(
         source="cinema_hall.name", read_only=True
     )
@@ -119,9 +184,30 @@ class MovieSessionListSerializer(MovieSessionSerializer):
             "cinema_hall_capacity",
             "tickets_available",
         )
+        list_serializer_class = CompiledMovieSessionListSerializer
+
+
+class MovieSessionRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolve every movie session of an order only once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._movie_sessions = {}
+
+    def to_internal_value(self, data):
+        # the raw pk is a cache key, so it has to be hashable
+        if isinstance(data, bool) or not isinstance(data, (str, int)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if data not in self._movie_sessions:
+            self._movie_sessions[data] = super().to_internal_value(data)
+        return self._movie_sessions[data]
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    movie_session = MovieSessionRelatedField(
+        queryset=MovieSession.objects.select_related("cinema_hall")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -135,6 +221,7 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "movie_session")
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -150,14 +237,47 @@ class TicketSeatsSerializer(TicketSerializer):
 class MovieSessionDetailSerializer(MovieSessionSerializer):
     movie = MovieListSerializer(many=False, read_only=True)
     cinema_hall = CinemaHallSerializer(many=False, read_only=True)
-    taken_places = TicketSeatsSerializer(
-        source="tickets", many=True, read_only=True
-    )
+    taken_places = serializers.SerializerMethodField()
 
     class Meta:
         model = MovieSession
         fields = ("id", "show_time", "movie", "cinema_hall", "taken_places")
 
+    def get_taken_places(self, movie_session):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in movie_session.seat_map.taken_places()
+        ]
+
+
+class MovieSessionSeatMapDetailSerializer(MovieSessionDetailSerializer):
+    """Taken places packed into a base64 encoded row-major bitmap"""
+
+    taken_places = serializers.CharField(
+        source="seat_map.to_base64", read_only=True
+    )
+
+
+class SeatPlaceSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    """Seats of a movie session held for the current user,
+    `movie_session` has to be passed in the context"""
+
+    seats = SeatPlaceSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate_seats(self, seats):
+        cinema_hall = self.context["movie_session"].cinema_hall
+        for place in seats:
+            Ticket.validate_ticket(
+                place["row"], place["seat"], cinema_hall, ValidationError
+            )
+        return seats
+
 
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
@@ -166,13 +286,15 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "tickets", "created_at")
 
+    def validate_tickets(self, tickets):
+        validate_tickets(
+            tickets, ValidationError, user_id=self.context["request"].user.id
+        )
+        return tickets
+
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        tickets_data = validated_data.pop("tickets")
+        return place_order(tickets_data, **validated_data)
 
 
 class OrderListSerializer(OrderSerializer):
@@ -0,0 +1,204 @@
+import threading
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from cinema import cache, images, search
+from cinema.booking import rebuild_seat_maps, release_seats, take_seats
+from cinema.models import (
+    Actor,
+    CinemaHall,
+    Genre,
+    Movie,
+    MovieSession,
+    Ticket,
+)
+
+CACHE_NAMESPACES = {
+    Genre: ("genres", "movies"),
+    Actor: ("actors", "movies"),
+    Movie: ("movies",),
+    CinemaHall: ("cinema_halls",),
+    Movie.genres.through: ("movies",),
+    Movie.actors.through: ("movies",),
+}
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_place(sender, instance, **kwargs):
+    instance._previous_place = (
+        Ticket.objects.filter(pk=instance.pk).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(sender, instance, **kwargs):
+    previous_place = getattr(instance, "_previous_place", None)
+    if previous_place is not None:
+        release_seats([previous_place])
+    take_seats([instance])
+
+
+# movie sessions of tickets about to be deleted by the current thread
+_deleted_tickets = threading.local()
+
+
+@receiver(pre_delete, sender=Ticket)
+def remember_deleted_ticket_session(sender, instance, **kwargs):
+    if not hasattr(_deleted_tickets, "movie_session_ids"):
+        _deleted_tickets.movie_session_ids = set()
+    _deleted_tickets.movie_session_ids.add(instance.movie_session_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    # a cascade sends pre_delete for all of its tickets before deleting
+    # any, so the first post_delete rebuilds each seat map once
+    movie_session_ids = getattr(_deleted_tickets, "movie_session_ids", None)
+    if movie_session_ids:
+        _deleted_tickets.movie_session_ids = set()
+        rebuild_seat_maps(movie_session_ids)
+
+
+@receiver(pre_save, sender=MovieSession)
+def remember_movie_session_hall(
+    sender, instance, update_fields=None, **kwargs
+):
+    instance._previous_cinema_hall_id = None
+    if update_fields is not None and "cinema_hall" not in update_fields:
+        return
+    if instance.pk:
+        instance._previous_cinema_hall_id = (
+            MovieSession.objects.filter(pk=instance.pk)
+            .values_list("cinema_hall_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=MovieSession)
+def rebuild_moved_movie_session(sender, instance, **kwargs):
+    previous_cinema_hall_id = getattr(
+        instance, "_previous_cinema_hall_id", None
+    )
+    if previous_cinema_hall_id not in (None, instance.cinema_hall_id):
+        rebuild_seat_maps([instance.id])
+
+
+@receiver(pre_save, sender=CinemaHall)
+def remember_cinema_hall_size(sender, instance, **kwargs):
+    instance._previous_size = (
+        CinemaHall.objects.filter(pk=instance.pk)
+        .values_list("rows", "seats_in_row")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=CinemaHall)
+def rebuild_resized_cinema_hall(sender, instance, **kwargs):
+    previous_size = getattr(instance, "_previous_size", None)
+    if previous_size not in (None, (instance.rows, instance.seats_in_row)):
+        rebuild_seat_maps(
+            instance.movie_sessions.values_list("id", flat=True)
+        )
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+def invalidate_catalog_cache(sender, **kwargs):
+    if sender in CACHE_NAMESPACES:
+        # a read before the commit would cache the old rows
+        # under a version bumped in the transaction
+        transaction.on_commit(
+            partial(cache.invalidate, *CACHE_NAMESPACES[sender])
+        )
+
+
+@receiver(pre_save, sender=Movie)
+def remember_movie_image(sender, instance, update_fields=None, **kwargs):
+    instance._previous_image = None
+    if update_fields is not None and "image" not in update_fields:
+        return
+    previous_image = (
+        Movie.objects.filter(pk=instance.pk)
+        .values("image", "image_renditions")
+        .first()
+        if instance.pk
+        else None
+    )
+    previous_name = previous_image["image"] if previous_image else None
+    if (previous_name or "") != (instance.image.name or ""):
+        instance._previous_image = previous_image or {}
+        instance.image_renditions = {}
+
+
+@receiver(post_save, sender=Movie)
+def render_movie_image(sender, instance, **kwargs):
+    previous_image = getattr(instance, "_previous_image", None)
+    if previous_image is None:
+        return
+    if previous_image:
+        images.release_files(
+            previous_image["image"], previous_image["image_renditions"]
+        )
+    if instance.image:
+        images.schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Movie)
+def release_movie_image(sender, instance, **kwargs):
+    images.release_files(instance.image.name, instance.image_renditions)
+
+
+@receiver(post_save, sender=Movie)
+def index_movie(sender, instance, **kwargs):
+    search.index_movies([instance.id])
+
+
+@receiver(post_delete, sender=Movie)
+def remove_movie_from_index(sender, instance, **kwargs):
+    search.remove_movies([instance.id])
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+def index_movie_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._cleared_movie_ids = list(
+            instance.movie_set.values_list("id", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        search.index_movies(pk_set if reverse else [instance.id])
+    elif action == "post_clear":
+        search.index_movies(
+            instance._cleared_movie_ids if reverse else [instance.id]
+        )
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def remember_related_movies(sender, instance, **kwargs):
+    instance._related_movie_ids = list(
+        instance.movie_set.values_list("id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def index_related_movies(sender, instance, **kwargs):
+    movie_ids = getattr(instance, "_related_movie_ids", None)
+    if movie_ids is None:
+        movie_ids = instance.movie_set.values_list("id", flat=True)
+    search.index_movies(movie_ids)
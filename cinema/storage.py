@@ -0,0 +1,76 @@
+"""
+Content-addressed storage of movie images.
+
+Files are named after the SHA-256 of their bytes, so uploading the same
+poster twice stores it once. Every save takes a reference to the file
+in the StoredFile table and release() drops one, the file is deleted
+when its last reference is released.
+"""
+
+import hashlib
+import os
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models import F
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _stored_files(self):
+        return apps.get_model("cinema", "StoredFile").objects
+
+    def content_name(self, name, content):
+        """`<directory>/<xx>/<sha256><extension>` of the content"""
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, filename = os.path.split(name)
+        _, extension = os.path.splitext(filename)
+        hexdigest = digest.hexdigest()
+        return os.path.join(
+            directory, hexdigest[:2], f"{hexdigest}{extension.lower()}"
+        )
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        with transaction.atomic():
+            # the row lock keeps the file from being collected meanwhile
+            stored_file, created = (
+                self._stored_files()
+                .select_for_update()
+                .get_or_create(name=name, defaults={"references": 1})
+            )
+            if not created:
+                self._stored_files().filter(name=name).update(
+                    references=F("references") + 1
+                )
+            if not self.exists(name):
+                super()._save(name, content)
+        return name
+
+    def release(self, *names):
+        """Drop a reference to each file and delete the files without
+        references once the current transaction commits"""
+        names = [name for name in names if name]
+        if not names:
+            return
+        self._stored_files().filter(name__in=names).update(
+            references=F("references") - 1
+        )
+        transaction.on_commit(lambda: self.collect(names))
+
+    def collect(self, names):
+        for name in names:
+            with transaction.atomic():
+                deleted, _ = (
+                    self._stored_files()
+                    .filter(name=name, references__lte=0)
+                    .delete()
+                )
+                if deleted:
+                    self.delete(name)
+
+
+def movie_image_storage():
+    return storages["movie_images"]
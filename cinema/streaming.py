@@ -0,0 +1,61 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework import mixins
+from rest_framework.settings import api_settings
+
+from cinema.renderers import FastJSONRenderer, NDJSONRenderer
+
+
+class StreamingListModelMixin(mixins.ListModelMixin):
+    """Stream the whole list row by row with bounded memory
+    when asked with `?stream=1` (a JSON array) or with
+    `Accept: application/x-ndjson` (one object per line).
+
+    Rows are read with a server-side iterator, prefetched and
+    serialized `stream_chunk_size` at a time. Streamed responses
+    bypass pagination and the catalog response cache.
+    """
+
+    stream_chunk_size = 500
+    renderer_classes = (
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer,
+    )
+
+    def wants_stream(self, request):
+        return isinstance(
+            request.accepted_renderer, NDJSONRenderer
+        ) or request.query_params.get("stream") in ("1", "true")
+
+    def list(self, request, *args, **kwargs):
+        if not self.wants_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            content = self.stream_ndjson(queryset)
+            content_type = NDJSONRenderer.media_type
+        else:
+            content = self.stream_json(queryset)
+            content_type = FastJSONRenderer.media_type
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    def stream_rows(self, queryset):
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(rows, self.stream_chunk_size)):
+            yield from self.get_serializer(chunk, many=True).data
+
+    def stream_ndjson(self, queryset):
+        renderer = NDJSONRenderer()
+        for row in self.stream_rows(queryset):
+            yield renderer.render(row)
+
+    def stream_json(self, queryset):
+        """The same bytes the renderer gives for the whole list"""
+        renderer = FastJSONRenderer()
+        separator = b"["
+        for row in self.stream_rows(queryset):
+            yield separator + renderer.render(row)
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
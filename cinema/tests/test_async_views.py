@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from cinema import benchmark
+from cinema.cache import catalog_cache
+from cinema.models import Actor, CinemaHall, Genre, Movie, MovieSession
+from user.authentication import token_cache
+
+
+class AsyncCatalogViewTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        token_cache.clear()
+        user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.token = Token.objects.create(user=user)
+        self.auth = {"Authorization": f"Token {self.token.key}"}
+
+        hall = CinemaHall.objects.create(name="Blue", rows=5, seats_in_row=6)
+        for index in range(3):
+            movie = Movie.objects.create(
+                title=f"Movie {index}",
+                description="Description",
+                duration=90,
+            )
+            movie.genres.add(Genre.objects.create(name=f"Genre {index}"))
+            movie.actors.add(
+                Actor.objects.create(first_name="Ann", last_name=f"{index}")
+            )
+            MovieSession.objects.create(
+                show_time=f"2022-06-0{index + 1} 14:00:00",
+                movie=movie,
+                cinema_hall=hall,
+            )
+        self.movie = Movie.objects.first()
+        self.movie_session = MovieSession.objects.first()
+
+    async def assert_same_response(self, sync_url, async_url):
+        sync_response = await self.async_client.get(sync_url, headers=self.auth)
+        async_response = await self.async_client.get(
+            async_url, headers=self.auth
+        )
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(
+            async_response["Content-Type"], sync_response["Content-Type"]
+        )
+
+    async def test_movie_list_matches_sync_view(self):
+        await self.assert_same_response(
+            reverse("cinema:movie-list") + "?genres=1,2",
+            reverse("cinema:movie-list-async") + "?genres=1,2",
+        )
+
+    async def test_movie_detail_matches_sync_view(self):
+        await self.assert_same_response(
+            reverse("cinema:movie-detail", args=[self.movie.id]),
+            reverse("cinema:movie-detail-async", args=[self.movie.id]),
+        )
+
+    async def test_movie_session_list_matches_sync_view(self):
+        await self.assert_same_response(
+            reverse("cinema:moviesession-list") + "?movie=1",
+            reverse("cinema:moviesession-list-async") + "?movie=1",
+        )
+
+    async def test_paginated_list_matches_sync_view(self):
+        sync_res = await self.async_client.get(
+            reverse("cinema:moviesession-list") + "?page_size=2",
+            headers=self.auth,
+        )
+        async_res = await self.async_client.get(
+            reverse("cinema:moviesession-list-async") + "?page_size=2",
+            headers=self.auth,
+        )
+
+        self.assertEqual(async_res.json()["results"], sync_res.json()["results"])
+        self.assertIn("/async/movie_sessions/?cursor=", async_res.json()["next"])
+
+    async def test_movie_session_detail_matches_sync_view(self):
+        await self.assert_same_response(
+            reverse("cinema:moviesession-detail", args=[self.movie_session.id]),
+            reverse(
+                "cinema:moviesession-detail-async",
+                args=[self.movie_session.id],
+            ),
+        )
+
+    async def test_anonymous_request_is_rejected(self):
+        res = await self.async_client.get(reverse("cinema:movie-list-async"))
+
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+    async def test_missing_object_is_not_found(self):
+        res = await self.async_client.get(
+            reverse("cinema:movie-detail-async", args=[0]), headers=self.auth
+        )
+        sync_res = await self.async_client.get(
+            reverse("cinema:movie-detail", args=[0]), headers=self.auth
+        )
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res.content, sync_res.content)
+
+    def test_async_load_is_measured(self):
+        results = benchmark.run_async_load(
+            concurrency=(1, 4), requests=8, only=["movies.list"]
+        )
+
+        self.assertEqual(set(results), {"movies.list"})
+        for level in ("1", "4"):
+            for kind in ("sync", "async"):
+                self.assertEqual(
+                    results["movies.list"][level][kind]["status"], [200]
+                )
@@ -0,0 +1,80 @@
+from django.test import TestCase
+
+from cinema import benchmark
+from cinema.models import MovieSession, Ticket
+
+
+class BenchmarkTests(TestCase):
+    def test_seeded_dataset_is_consistent(self):
+        dataset = benchmark.seed_dataset(
+            movies=5,
+            movie_sessions=10,
+            users=3,
+            orders=5,
+            tickets=300,
+            actors=5,
+            cinema_halls=2,
+        )
+
+        self.assertEqual(dataset["movies"], 5)
+        self.assertEqual(dataset["tickets"], Ticket.objects.count())
+        for movie_session in MovieSession.objects.select_related(
+            "cinema_hall"
+        ):
+            self.assertEqual(
+                movie_session.tickets_sold, movie_session.tickets.count()
+            )
+
+    def test_every_endpoint_is_measured(self):
+        benchmark.seed_dataset(
+            movies=5, movie_sessions=5, users=2, orders=3, tickets=20
+        )
+
+        results = benchmark.run_endpoints(repeat=2)
+
+        self.assertLessEqual(
+            {
+                "genres.create",
+                "movies.list",
+                "movies.create",
+                "movie_sessions.update",
+                "movie_sessions.holds.create",
+                "orders.create",
+                "user.register",
+                "user.token",
+                "user.token.refresh",
+                "user.token.revoke",
+            },
+            set(results),
+        )
+        for name, result in results.items():
+            with self.subTest(endpoint=name):
+                self.assertIn(result["status"], (200, 201, 204))
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+    def test_endpoints_are_filtered_by_prefix(self):
+        benchmark.seed_dataset(
+            movies=5, movie_sessions=5, users=2, orders=3, tickets=20
+        )
+
+        results = benchmark.run_endpoints(repeat=2, only=["movies."])
+
+        self.assertEqual(
+            set(results),
+            {
+                "movies.list",
+                "movies.list.page",
+                "movies.retrieve",
+                "movies.create",
+            },
+        )
+
+    def test_sqlite_modes_are_compared(self):
+        results = benchmark.compare_sqlite_modes(
+            readers=1, writers=1, duration=0.2
+        )
+
+        for mode in ("rollback_journal", "tuned"):
+            self.assertGreater(results[mode]["writes_per_second"], 0)
+        self.assertEqual(results["tuned"]["busy_errors"], 0)
+        self.assertIn("read_speedup", results)
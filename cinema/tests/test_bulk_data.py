@@ -0,0 +1,115 @@
+import io
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from cinema import bulk_data
+from cinema.models import Movie, MovieSession, Order, Ticket
+
+FIXTURE = settings.BASE_DIR / "cinema_service_db_data.json"
+
+
+def dump(fmt="ndjson"):
+    output = io.StringIO()
+    with mock.patch("sys.stderr", io.StringIO()):
+        call_command("bulk_dump", format=fmt, stdout=output)
+    return output.getvalue()
+
+
+class ReadObjectsTests(TestCase):
+    def test_json_array_and_ndjson_across_reads(self):
+        objects = [{"pk": index, "name": "x" * index} for index in range(50)]
+
+        with mock.patch.object(bulk_data, "READ_SIZE", 7):
+            from_array = list(
+                bulk_data.read_objects(io.StringIO(json.dumps(objects)))
+            )
+            from_lines = list(
+                bulk_data.read_objects(
+                    io.StringIO(
+                        "\n".join(json.dumps(obj) for obj in objects) + "\n"
+                    )
+                )
+            )
+
+        self.assertEqual(from_array, objects)
+        self.assertEqual(from_lines, objects)
+        self.assertEqual(list(bulk_data.read_objects(io.StringIO("[]"))), [])
+
+    def test_truncated_stream_is_an_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(bulk_data.read_objects(io.StringIO('[{"pk": 1}, {"pk"')))
+
+
+class BulkLoadTests(TestCase):
+    def load(self, *paths, **options):
+        output = io.StringIO()
+        call_command("bulk_load", *paths, stdout=output, **options)
+        return output.getvalue()
+
+    def test_bundled_fixture_is_loaded(self):
+        output = self.load(str(FIXTURE), batch_size=3)
+
+        self.assertIn("cinema.ticket: 16 rows", output)
+        self.assertIn("rows/s", output)
+        self.assertEqual(Ticket.objects.count(), 16)
+        self.assertEqual(
+            list(Movie.objects.get(pk=1).genres.values_list("pk", flat=True)),
+            [1, 2, 3],
+        )
+        self.assertEqual(
+            Order.objects.get(pk=1).created_at.isoformat(),
+            "2022-08-09T09:06:18.876000",
+        )
+        for movie_session in MovieSession.objects.select_related(
+            "cinema_hall"
+        ):
+            self.assertEqual(
+                movie_session.tickets_sold, movie_session.tickets.count()
+            )
+            self.assertEqual(
+                sorted(movie_session.seat_map.taken_places()),
+                sorted(movie_session.tickets.values_list("row", "seat")),
+            )
+
+    def test_dump_loads_back_identically(self):
+        self.load(str(FIXTURE))
+        ndjson = dump()
+        json_array = dump("json")
+        for model in reversed(bulk_data.dependency_order()):
+            model.objects.all().delete()
+
+        with mock.patch("sys.stdin", io.StringIO(ndjson)):
+            self.load("-")
+
+        self.assertEqual(dump(), ndjson)
+        self.assertEqual(
+            json.loads(json_array),
+            [json.loads(line) for line in ndjson.splitlines()],
+        )
+
+    def test_invalid_ticket_loads_nothing(self):
+        with open(FIXTURE) as fixture:
+            objects = json.load(fixture)
+        for obj in objects:
+            if obj["model"] == "cinema.ticket":
+                obj["fields"]["seat"] = 1000
+                break
+
+        with mock.patch(
+            "sys.stdin", io.StringIO(json.dumps(objects))
+        ), self.assertRaisesRegex(CommandError, "seat number"):
+            self.load("-")
+
+        self.assertFalse(Movie.objects.exists())
+
+    def test_models_of_other_apps_are_rejected(self):
+        fixture = '{"model": "auth.group", "pk": 1, "fields": {"name": "a"}}'
+
+        with mock.patch(
+            "sys.stdin", io.StringIO(fixture)
+        ), self.assertRaisesRegex(CommandError, "auth.Group"):
+            self.load("-")
@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.cache import catalog_cache
+from cinema.models import Movie, Genre
+
+GENRE_URL = reverse("cinema:genre-list")
+MOVIE_URL = reverse("cinema:movie-list")
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.genre = Genre.objects.create(name="Drama")
+        self.movie = Movie.objects.create(
+            title="Sample movie", description="Sample description", duration=90
+        )
+        self.movie.genres.add(self.genre)
+
+    def test_cached_list_runs_no_queries(self):
+        self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{"id": self.genre.id, "name": "Drama"}])
+
+    def test_conditional_get_returns_not_modified(self):
+        res = self.client.get(MOVIE_URL)
+
+        not_modified = self.client.get(
+            MOVIE_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_if_modified_since_is_ignored(self):
+        res = self.client.get(MOVIE_URL)
+        self.movie.title = "Changed in the same second"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.save()
+
+        changed = self.client.get(
+            MOVIE_URL, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            changed.data[0]["title"], "Changed in the same second"
+        )
+
+    def test_query_params_are_part_of_cache_key(self):
+        self.client.get(MOVIE_URL)
+
+        res = self.client.get(MOVIE_URL, {"title": "other"})
+
+        self.assertEqual(res.data, [])
+
+    def test_genre_change_invalidates_movie_list(self):
+        res = self.client.get(MOVIE_URL)
+        self.genre.name = "Comedy"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.save()
+
+        changed = self.client.get(MOVIE_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data[0]["genres"], ["Comedy"])
+
+    def test_m2m_change_invalidates_movie_list(self):
+        self.client.get(MOVIE_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.genres.clear()
+
+        res = self.client.get(MOVIE_URL)
+
+        self.assertEqual(res.data[0]["genres"], [])
+
+    def test_change_invalidates_only_after_commit(self):
+        res = self.client.get(GENRE_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Genre.objects.create(name="Comedy")
+            # a concurrent read inside the writing transaction
+            not_modified = self.client.get(
+                GENRE_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+        changed = self.client.get(GENRE_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(changed.data), 2)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "cinema.example.com"])
+    def test_host_and_scheme_are_part_of_cache_key(self):
+        Movie.objects.create(title="Other", description="", duration=90)
+        params = {"page_size": 1}
+        self.client.get(MOVIE_URL, params)
+
+        res = self.client.get(
+            MOVIE_URL, params, HTTP_HOST="cinema.example.com", secure=True
+        )
+
+        self.assertTrue(
+            res.data["next"].startswith("https://cinema.example.com/")
+        )
+
+    def test_unauthenticated_response_is_not_cached(self):
+        self.client.force_authenticate(None)
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertNotIn("ETag", res)
@@ -0,0 +1,167 @@
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.db import connection, connections
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from cinema.models import Genre, Movie, MovieSession, Order, Ticket
+from cinema_service.database import database_settings, immediate_atomic
+from cinema_service.routers import PrimaryReplicaRouter
+
+BASE_DIR = Path("/srv/cinema")
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_sqlite_is_the_default(self):
+        databases = database_settings(BASE_DIR, environ={})
+
+        self.assertEqual(list(databases), ["default"])
+        self.assertEqual(
+            databases["default"]["ENGINE"], "django.db.backends.sqlite3"
+        )
+        self.assertEqual(databases["default"]["NAME"], BASE_DIR / "db.sqlite3")
+
+    def test_sqlite_tuning_can_be_disabled(self):
+        databases = database_settings(
+            BASE_DIR, environ={"DATABASE_SQLITE_TUNING": "0"}
+        )
+
+        self.assertNotIn("OPTIONS", databases["default"])
+
+    def test_postgresql_profile_with_replicas(self):
+        databases = database_settings(
+            BASE_DIR,
+            environ={
+                "DATABASE_ENGINE": "postgresql",
+                "DATABASE_HOST": "primary",
+                "DATABASE_CONN_MAX_AGE": "300",
+                "DATABASE_REPLICA_HOSTS": "replica-a, replica-b",
+            },
+        )
+
+        self.assertEqual(
+            list(databases), ["default", "replica_1", "replica_2"]
+        )
+        primary = databases["default"]
+        self.assertEqual(
+            primary["ENGINE"], "django.db.backends.postgresql"
+        )
+        self.assertEqual(primary["HOST"], "primary")
+        self.assertEqual(primary["CONN_MAX_AGE"], 300)
+        self.assertTrue(primary["CONN_HEALTH_CHECKS"])
+        self.assertEqual(databases["replica_2"]["HOST"], "replica-b")
+        self.assertEqual(
+            databases["replica_1"]["TEST"], {"MIRROR": "default"}
+        )
+
+    def test_pool_replaces_persistent_connections(self):
+        databases = database_settings(
+            BASE_DIR,
+            environ={
+                "DATABASE_ENGINE": "postgresql",
+                "DATABASE_POOL": "1",
+                "DATABASE_POOL_MAX_SIZE": "20",
+            },
+        )
+
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            databases["default"]["OPTIONS"]["pool"],
+            {"min_size": 2, "max_size": 20},
+        )
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        patcher = mock.patch.object(
+            PrimaryReplicaRouter, "replicas", return_value=["replica_1"]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_catalog_reads_go_to_replicas(self):
+        self.assertEqual(self.router.db_for_read(Movie), "replica_1")
+        self.assertEqual(self.router.db_for_read(MovieSession), "replica_1")
+
+    def test_orders_and_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Order), "default")
+        self.assertEqual(self.router.db_for_read(Ticket), "default")
+        self.assertEqual(self.router.db_for_write(Movie), "default")
+        self.assertEqual(self.router.db_for_write(Order), "default")
+
+    def test_reads_in_transactions_stay_on_primary(self):
+        with mock.patch.object(
+            connections["default"], "in_atomic_block", True
+        ):
+            self.assertEqual(self.router.db_for_read(Movie), "default")
+
+    def test_related_objects_come_from_the_instance_database(self):
+        movie = Movie()
+        movie._state.db = "replica_1"
+
+        self.assertEqual(
+            self.router.db_for_read(Order, instance=movie), "replica_1"
+        )
+
+    def test_no_replicas_means_primary(self):
+        with mock.patch.object(
+            PrimaryReplicaRouter, "replicas", return_value=[]
+        ):
+            self.assertEqual(self.router.db_for_read(Movie), "default")
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate("default", "cinema"))
+        self.assertFalse(self.router.allow_migrate("replica_1", "cinema"))
+
+
+class SQLiteConnectionTests(TransactionTestCase):
+    def test_sqlite_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            handler = ConnectionHandler(
+                database_settings(
+                    Path(directory), environ={"DATABASE_BUSY_TIMEOUT": "250"}
+                )
+            )
+            with handler["default"].cursor() as cursor:
+                pragmas = {
+                    name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in (
+                        "journal_mode",
+                        "synchronous",
+                        "cache_size",
+                        "busy_timeout",
+                    )
+                }
+            handler.close_all()
+
+        self.assertEqual(
+            pragmas,
+            {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "cache_size": -65536,
+                "busy_timeout": 250,
+            },
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "BEGIN IMMEDIATE is SQLite's")
+    def test_sqlite_transaction_begins_immediate(self):
+        with CaptureQueriesContext(connection) as context:
+            with immediate_atomic():
+                Genre.objects.create(name="Drama")
+            with immediate_atomic():
+                with immediate_atomic():
+                    Genre.objects.create(name="Comedy")
+
+        begins = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("BEGIN")
+        ]
+        self.assertEqual(begins, ["BEGIN IMMEDIATE", "BEGIN IMMEDIATE"])
+        self.assertIsNone(connection.transaction_mode)
+        self.assertEqual(Genre.objects.count(), 2)
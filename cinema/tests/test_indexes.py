@@ -0,0 +1,54 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from cinema.views import MovieViewSet, MovieSessionViewSet, OrderViewSet
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite's")
+class FilterIndexTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+
+    def query_plan(self, viewset_class, params=None):
+        view = viewset_class(
+            request=Request(APIRequestFactory().get("/", params)),
+            action="list",
+            format_kwarg=None,
+        )
+        view.request.user = self.user
+        return view.get_queryset().explain()
+
+    def test_movie_sessions_by_date_use_show_time_index(self):
+        plan = self.query_plan(MovieSessionViewSet, {"date": "2022-06-02"})
+
+        self.assertIn("moviesession_show_time_idx", plan)
+
+    def test_movie_sessions_by_date_and_movie_use_composite_index(self):
+        plan = self.query_plan(
+            MovieSessionViewSet, {"date": "2022-06-02", "movie": "1"}
+        )
+
+        self.assertIn("moviesession_movie_time_idx", plan)
+
+    def test_orders_of_user_use_composite_index(self):
+        plan = self.query_plan(OrderViewSet)
+
+        self.assertIn("order_user_created_at_idx", plan)
+
+    def test_movies_by_genres_use_m2m_index(self):
+        plan = self.query_plan(MovieViewSet, {"genres": "1,2"})
+
+        self.assertIn("movie_genres_genre_movie_idx", plan)
+
+    def test_movies_by_actors_use_m2m_index(self):
+        plan = self.query_plan(MovieViewSet, {"actors": "1,2"})
+
+        self.assertIn("movie_actors_actor_movie_idx", plan)
@@ -0,0 +1,107 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from cinema.cache import catalog_cache
+from cinema.models import Movie
+from cinema_service.instrumentation import (
+    InstrumentationMiddleware,
+    registry,
+)
+
+MOVIE_URL = reverse("cinema:movie-list")
+METRICS_URL = reverse("metrics")
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        registry.reset()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+
+    def get_movies(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(MOVIE_URL)
+
+    def test_server_timing_header(self):
+        res = self.get_movies()
+
+        self.assertIn("db;dur=", res["Server-Timing"])
+        self.assertIn("serialize;dur=", res["Server-Timing"])
+        self.assertIn("render;dur=", res["Server-Timing"])
+        self.assertIn("total;dur=", res["Server-Timing"])
+
+    def test_serializer_time_is_measured(self):
+        Movie.objects.create(title="Sample", description="", duration=90)
+
+        self.get_movies()
+
+        movie_list = registry.snapshot()["MovieViewSet.list"]
+        self.assertEqual(movie_list["serialize_ms"]["count"], 1)
+        self.assertGreater(movie_list["serialize_ms"]["sum"], 0)
+
+    def test_metrics_are_aggregated_per_viewset_action(self):
+        self.get_movies()
+        self.get_movies()
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+
+        metrics = self.client.get(METRICS_URL)
+
+        movie_list = metrics.json()["views"]["MovieViewSet.list"]
+        self.assertEqual(movie_list["total_ms"]["count"], 2)
+        self.assertEqual(movie_list["queries"]["buckets"]["+Inf"], 2)
+
+    def test_metrics_are_hidden_from_local_users(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="127.0.0.1")
+
+        self.assertEqual(res.status_code, 404)
+
+    @override_settings(METRICS_TOKEN="scraper-token")
+    def test_metrics_with_token(self):
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer scraper-token"
+        )
+        wrong = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer x")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(wrong.status_code, 404)
+
+    def test_middleware_is_async_under_asgi(self):
+        async def get_response(request):
+            return None
+
+        self.assertTrue(
+            iscoroutinefunction(InstrumentationMiddleware(get_response))
+        )
+
+    async def test_requests_are_measured_under_asgi(self):
+        token = await Token.objects.acreate(user=self.user)
+
+        res = await self.async_client.get(
+            MOVIE_URL, headers={"Authorization": f"Token {token.key}"}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("total;dur=", res["Server-Timing"])
+        movie_list = registry.snapshot()["MovieViewSet.list"]
+        self.assertEqual(movie_list["queries"]["buckets"]["0"], 0)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_measured(self):
+        res = self.get_movies()
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(registry.snapshot(), {})
@@ -0,0 +1,85 @@
+from django.test import TestCase
+from rest_framework.serializers import ListSerializer
+from rest_framework.test import APIRequestFactory
+
+from cinema import benchmark
+from cinema.models import Actor, CinemaHall, Genre, Movie, MovieSession
+from cinema.serializers import MovieListSerializer, MovieSessionListSerializer
+
+
+class CompiledListSerializerTests(TestCase):
+    def setUp(self):
+        hall = CinemaHall.objects.create(name="Blue", rows=5, seats_in_row=6)
+        genres = [Genre.objects.create(name=name) for name in "CBA"]
+        actors = [
+            Actor.objects.create(first_name="Ann", last_name=name)
+            for name in ("Zed", "Young")
+        ]
+        for index in range(4):
+            movie = Movie.objects.create(
+                title=f"Movie {index}",
+                description="Déjà vu",
+                duration=90 + index,
+            )
+            movie.genres.set(genres[index % 3:])
+            movie.actors.set(actors[: index % 3])
+            MovieSession.objects.create(
+                show_time=f"2022-06-0{index + 1} 14:30:00",
+                movie=movie,
+                cinema_hall=hall,
+            )
+        Movie.objects.filter(title="Movie 1").update(
+            image="uploads/movies/movie-1.jpg",
+            image_renditions={
+                "thumbnail": {
+                    "webp": "uploads/movies/renditions/movie-1-thumbnail.webp"
+                }
+            },
+        )
+        self.context = {"request": APIRequestFactory().get("/")}
+        self.cases = [
+            (
+                MovieListSerializer,
+                Movie.objects.prefetch_related("genres", "actors"),
+            ),
+            (
+                MovieSessionListSerializer,
+                MovieSession.objects.select_related("movie", "cinema_hall"),
+            ),
+        ]
+
+    def assert_same_as_drf(self, serializer_class, data, context):
+        expected = ListSerializer(
+            data, child=serializer_class(), context=context
+        ).data
+
+        self.assertEqual(
+            serializer_class(data, many=True, context=context).data, expected
+        )
+
+    def test_queryset_matches_drf_serializer(self):
+        for serializer_class, queryset in self.cases:
+            for context in ({}, self.context):
+                self.assert_same_as_drf(
+                    serializer_class, queryset.order_by("-id"), context
+                )
+
+    def test_loaded_objects_match_drf_serializer(self):
+        for serializer_class, queryset in self.cases:
+            for context in ({}, self.context):
+                self.assert_same_as_drf(
+                    serializer_class, list(queryset), context
+                )
+
+    def test_queryset_is_read_with_values_and_relation_tables(self):
+        queryset = Movie.objects.prefetch_related("genres", "actors")
+
+        with self.assertNumQueries(3):
+            MovieListSerializer(queryset, many=True).data
+
+    def test_benchmark_compares_both_serializers(self):
+        results = benchmark.compare_list_serializers(repeat=1)
+
+        self.assertEqual(set(results), {"movies", "movie_sessions"})
+        self.assertTrue(results["movies"]["identical"])
+        self.assertTrue(results["movie_sessions"]["identical"])
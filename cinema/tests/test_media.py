@@ -0,0 +1,111 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+CONTENT_ADDRESSED_NAME = f"uploads/movies/{DIGEST[:2]}/{DIGEST}.jpg"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in (CONTENT_ADDRESSED_NAME, "uploads/poster.jpg"):
+            path = os.path.join(MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as media_file:
+                media_file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, name, **headers):
+        return self.client.get(f"/media/{name}", headers=headers)
+
+    def test_content_addressed_file_is_immutable(self):
+        res = self.get(CONTENT_ADDRESSED_NAME)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(res["ETag"], f'"{DIGEST}"')
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+
+    def test_other_file_is_revalidated(self):
+        res = self.get("uploads/poster.jpg")
+
+        self.assertEqual(res["Cache-Control"], "public, no-cache")
+        self.assertNotEqual(res["ETag"], f'"{DIGEST}"')
+
+    def test_matching_etag_is_not_modified(self):
+        res = self.get(CONTENT_ADDRESSED_NAME, if_none_match=f'"{DIGEST}"')
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_byte_ranges(self):
+        for header, start, end in [
+            ("bytes=0-9", 0, 9),
+            ("bytes=1000-", 1000, 1023),
+            ("bytes=-24", 1000, 1023),
+            ("bytes=1000-5000", 1000, 1023),
+        ]:
+            res = self.get(CONTENT_ADDRESSED_NAME, range=header)
+
+            self.assertEqual(res.status_code, 206)
+            self.assertEqual(
+                b"".join(res.streaming_content), CONTENT[start:end + 1]
+            )
+            self.assertEqual(res["Content-Range"], f"bytes {start}-{end}/1024")
+            self.assertEqual(res["Content-Length"], str(end - start + 1))
+
+    def test_unsatisfiable_range(self):
+        res = self.get(CONTENT_ADDRESSED_NAME, range="bytes=2000-")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], "bytes */1024")
+
+    def test_invalid_or_stale_range_sends_whole_file(self):
+        for headers in [
+            {"range": "bytes=0-1,5-9"},
+            {"range": "bytes=9-0"},
+            {"range": "bytes=0-9", "if_range": '"stale"'},
+        ]:
+            res = self.get(CONTENT_ADDRESSED_NAME, **headers)
+
+            self.assertEqual(res.status_code, 200)
+
+    def test_missing_file_and_traversal_are_not_found(self):
+        for name in ("uploads/missing.jpg", "../settings.py", "uploads"):
+            self.assertEqual(self.get(name).status_code, 404)
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel-redirect")
+    def test_x_accel_redirect_mode(self):
+        res = self.get(CONTENT_ADDRESSED_NAME)
+
+        self.assertEqual(
+            res["X-Accel-Redirect"],
+            f"/protected-media/{CONTENT_ADDRESSED_NAME}",
+        )
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["ETag"], f'"{DIGEST}"')
+
+    @override_settings(MEDIA_SERVE_MODE="x-sendfile")
+    def test_x_sendfile_mode(self):
+        res = self.get("uploads/poster.jpg")
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(MEDIA_ROOT, "uploads/poster.jpg")
+        )
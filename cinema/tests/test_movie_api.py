@@ -42,17 +42,18 @@ def sample_actor(**params):
     return Actor.objects.create(**defaults)
 
 
-def sample_movie_session(**params):
+def sample_movie_session(rows=20, seats_in_row=20, **params):
     cinema_hall = CinemaHall.objects.create(
-        name="Blue", rows=20, seats_in_row=20
+        name="Blue", rows=rows, seats_in_row=seats_in_row
     )
 
     defaults = {
         "show_time": "2022-06-02 14:00:00",
-        "movie": None,
         "cinema_hall": cinema_hall,
     }
     defaults.update(params)
+    if "movie" not in defaults:
+        defaults["movie"] = sample_movie()
 
     return MovieSession.objects.create(**defaults)
 
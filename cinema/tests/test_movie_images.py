@@ -0,0 +1,197 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from cinema import images
+from cinema.cache import catalog_cache
+from cinema.models import CinemaHall, Movie, MovieSession, StoredFile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(
+    size=(1200, 1800), image_format="PNG", mode="RGBA", color="red"
+):
+    content = BytesIO()
+    Image.new(mode, size, color).save(content, format=image_format)
+    return ContentFile(content.getvalue(), name=f"poster.{image_format}")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MovieImageRenditionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.movie = Movie.objects.create(
+            title="Sample movie", description="Description", duration=90
+        )
+
+    @contextmanager
+    def rendering(self):
+        # render in the test thread, which sees the test transaction
+        with mock.patch.object(
+            images, "_image_executor"
+        ) as executor, self.captureOnCommitCallbacks(execute=True):
+            executor.return_value.submit.side_effect = (
+                lambda function, *args: images.generate_renditions(*args)
+            )
+            yield
+
+    def upload(self, movie=None, color="red"):
+        movie = movie or self.movie
+        with self.rendering():
+            res = self.client.post(
+                reverse("cinema:movie-upload-image", args=[movie.id]),
+                {"image": image_file(color=color)},
+                format="multipart",
+            )
+        movie.refresh_from_db()
+        return res
+
+    def stored_names(self, movie):
+        return [movie.image.name] + [
+            name
+            for names in movie.image_renditions.values()
+            for name in names.values()
+        ]
+
+    def test_upload_renders_every_size_and_format(self):
+        res = self.upload()
+
+        self.assertEqual(res.status_code, 200)
+        renditions = self.movie.image_renditions
+        self.assertEqual(set(renditions), {"thumbnail", "medium"})
+        for rendition, box in [
+            ("thumbnail", (160, 240)),
+            ("medium", (480, 720)),
+        ]:
+            self.assertEqual(set(renditions[rendition]), {"webp", "jpeg"})
+            for image_format, name in renditions[rendition].items():
+                with default_storage.open(name) as stored:
+                    image = Image.open(stored)
+                    self.assertEqual(image.format, image_format.upper())
+                    self.assertEqual(image.size, box)
+
+    def test_list_serves_thumbnail_and_detail_serves_original(self):
+        MovieSession.objects.create(
+            show_time="2022-06-02 14:00:00",
+            movie=self.movie,
+            cinema_hall=CinemaHall.objects.create(
+                name="Blue", rows=5, seats_in_row=6
+            ),
+        )
+        self.upload()
+        thumbnail = self.movie.image_renditions["thumbnail"]["webp"]
+
+        movies = self.client.get(reverse("cinema:movie-list"))
+        movie_sessions = self.client.get(reverse("cinema:moviesession-list"))
+        detail = self.client.get(
+            reverse("cinema:movie-detail", args=[self.movie.id])
+        )
+
+        self.assertTrue(movies.data[0]["image"].endswith(thumbnail))
+        self.assertTrue(
+            movie_sessions.data[0]["movie_image"].endswith(thumbnail)
+        )
+        self.assertTrue(detail.data["image"].endswith(self.movie.image.name))
+        self.assertTrue(
+            detail.data["image_renditions"]["medium"]["jpeg"].endswith(
+                self.movie.image_renditions["medium"]["jpeg"]
+            )
+        )
+
+    def test_renditions_of_replaced_image_are_discarded(self):
+        self.upload()
+        old_name = self.movie.image.name
+        with mock.patch.object(images, "schedule_renditions"):
+            self.movie.image.save(
+                "other.png", image_file(color="blue"), save=True
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.generate_renditions(self.movie.id, old_name)
+        self.movie.refresh_from_db()
+
+        self.assertEqual(self.movie.image_renditions, {})
+
+    def test_same_image_is_stored_once(self):
+        other_movie = Movie.objects.create(
+            title="Other movie", description="Description", duration=90
+        )
+
+        self.upload()
+        self.upload(other_movie)
+
+        self.assertEqual(self.movie.image.name, other_movie.image.name)
+        self.assertEqual(
+            self.movie.image_renditions, other_movie.image_renditions
+        )
+        self.assertEqual(
+            StoredFile.objects.get(name=self.movie.image.name).references, 2
+        )
+
+    def test_replaced_image_is_collected(self):
+        self.upload()
+        old_names = self.stored_names(self.movie)
+
+        self.upload(color="blue")
+
+        for name in old_names:
+            self.assertFalse(default_storage.exists(name))
+            self.assertFalse(StoredFile.objects.filter(name=name).exists())
+        for name in self.stored_names(self.movie):
+            self.assertTrue(default_storage.exists(name))
+
+    def test_image_is_collected_with_its_last_movie(self):
+        other_movie = Movie.objects.create(
+            title="Other movie", description="Description", duration=90
+        )
+        self.upload()
+        self.upload(other_movie)
+        names = self.stored_names(self.movie)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other_movie.delete()
+        for name in names:
+            self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.delete()
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
+
+    def test_command_renders_missing_renditions(self):
+        Movie.objects.filter(id=self.movie.id).update(
+            image=default_storage.save(
+                "uploads/movies/poster.jpg",
+                image_file(image_format="JPEG", mode="RGB"),
+            )
+        )
+
+        call_command("render_movie_images", stdout=StringIO())
+        self.movie.refresh_from_db()
+
+        self.assertEqual(
+            set(self.movie.image_renditions), {"thumbnail", "medium"}
+        )
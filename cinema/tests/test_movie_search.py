@@ -0,0 +1,99 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from cinema.cache import catalog_cache
+from cinema.models import Movie, Genre, Actor
+
+MOVIE_URL = reverse("cinema:movie-list")
+
+
+class MovieSearchTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.drama = Genre.objects.create(name="Drama")
+        self.actor = Actor.objects.create(
+            first_name="George", last_name="Clooney"
+        )
+        self.ocean = Movie.objects.create(
+            title="Ocean's Eleven",
+            description="A heist in Las Vegas",
+            duration=116,
+        )
+        self.ocean.actors.add(self.actor)
+        self.gravity = Movie.objects.create(
+            title="Gravity", description="Lost in space", duration=91
+        )
+        self.gravity.genres.add(self.drama)
+
+    def titles(self, params):
+        return [movie["title"] for movie in self.client.get(
+            MOVIE_URL, params
+        ).data]
+
+    def test_filter_by_title_substring(self):
+        self.assertEqual(self.titles({"title": "elev"}), ["Ocean's Eleven"])
+        self.assertEqual(self.titles({"title": "avit"}), ["Gravity"])
+        self.assertEqual(self.titles({"title": "n's el"}), ["Ocean's Eleven"])
+        self.assertEqual(self.titles({"title": "vegas"}), [])
+
+    def test_search_description_genres_and_actors(self):
+        self.assertEqual(self.titles({"search": "vegas"}), ["Ocean's Eleven"])
+        self.assertEqual(self.titles({"search": "dram"}), ["Gravity"])
+        self.assertEqual(
+            self.titles({"search": "george cloon"}), ["Ocean's Eleven"]
+        )
+
+    @skipUnless(
+        connection.vendor == "sqlite", "other databases don't rank matches"
+    )
+    def test_search_is_ranked(self):
+        Movie.objects.create(
+            title="Space", description="Space, space and space", duration=90
+        )
+
+        self.assertEqual(
+            self.titles({"search": "space"}), ["Space", "Gravity"]
+        )
+
+    def test_index_follows_changes(self):
+        self.actor.last_name = "Harrison"
+        self.actor.save()
+        self.gravity.genres.clear()
+        self.ocean.delete()
+
+        self.assertEqual(self.titles({"search": "harrison"}), [])
+        self.assertEqual(self.titles({"search": "drama"}), [])
+        self.assertEqual(self.titles({"title": "ocean"}), [])
+
+    def test_renamed_genre_is_reindexed(self):
+        self.drama.name = "Thriller"
+        self.drama.save()
+
+        self.assertEqual(self.titles({"search": "thriller"}), ["Gravity"])
+
+    @skipUnless(
+        connection.vendor == "sqlite", "other databases don't rank matches"
+    )
+    def test_search_pages_keep_rank_order(self):
+        Movie.objects.create(
+            title="Space", description="Space, space and space", duration=90
+        )
+
+        res = self.client.get(MOVIE_URL, {"search": "space", "page_size": 1})
+        titles = [res.data["results"][0]["title"]]
+        res = self.client.get(res.data["next"])
+        titles.append(res.data["results"][0]["title"])
+
+        self.assertEqual(titles, ["Space", "Gravity"])
+        self.assertIsNone(res.data["next"])
@@ -0,0 +1,181 @@
+import base64
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from cinema.models import MovieSession, CinemaHall, Order, Ticket
+from cinema.tests.test_movie_api import sample_movie_session
+
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+
+
+
+def detail_url(movie_session_id):
+    return reverse("cinema:moviesession-detail", args=[movie_session_id])
+
+
+class MovieSessionSeatMapTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session(rows=10, seats_in_row=12)
+        self.order = Order.objects.create(user=self.user)
+        for row, seat in [(3, 4), (1, 12), (10, 12)]:
+            Ticket.objects.create(
+                movie_session=self.movie_session,
+                order=self.order,
+                row=row,
+                seat=seat,
+            )
+
+    def test_taken_places_on_detail(self):
+        res = self.client.get(detail_url(self.movie_session.id))
+
+        self.assertEqual(
+            res.data["taken_places"],
+            [
+                {"row": 1, "seat": 12},
+                {"row": 3, "seat": 4},
+                {"row": 10, "seat": 12},
+            ],
+        )
+
+    def test_taken_places_as_bitmap(self):
+        res = self.client.get(
+            detail_url(self.movie_session.id), {"taken_places": "bitmap"}
+        )
+
+        bitmap = int.from_bytes(
+            base64.b64decode(res.data["taken_places"]), "little"
+        )
+        self.assertEqual(bitmap, (1 << 11) | (1 << 27) | (1 << 119))
+
+    def test_tickets_available_on_list(self):
+        res = self.client.get(MOVIE_SESSION_URL)
+
+        self.assertEqual(res.data[0]["tickets_available"], 117)
+
+    def test_deleted_ticket_releases_seat(self):
+        Ticket.objects.get(row=3, seat=4).delete()
+        res = self.client.get(detail_url(self.movie_session.id))
+
+        self.assertEqual(len(res.data["taken_places"]), 2)
+        self.assertNotIn({"row": 3, "seat": 4}, res.data["taken_places"])
+
+    def test_deleted_order_releases_all_seats(self):
+        self.order.delete()
+        self.movie_session.refresh_from_db()
+
+        self.assertEqual(self.movie_session.tickets_available, 120)
+
+    def test_deleted_order_rebuilds_seat_map_once(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    movie_session=self.movie_session,
+                    order=order,
+                    row=row,
+                    seat=seat,
+                )
+                for row in range(4, 10)
+                for seat in range(1, 13)
+            ]
+        )
+
+        with self.assertNumQueries(6):
+            order.delete()
+        self.movie_session.refresh_from_db()
+
+        self.assertEqual(self.movie_session.tickets_available, 117)
+
+    def test_moved_movie_session_rebuilds_seat_map(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.client.force_authenticate(admin)
+        cinema_hall = CinemaHall.objects.create(
+            name="Red", rows=10, seats_in_row=15
+        )
+
+        self.client.patch(
+            detail_url(self.movie_session.id),
+            {"cinema_hall": cinema_hall.id},
+        )
+        res = self.client.get(detail_url(self.movie_session.id))
+
+        self.assertEqual(
+            res.data["taken_places"],
+            [
+                {"row": 1, "seat": 12},
+                {"row": 3, "seat": 4},
+                {"row": 10, "seat": 12},
+            ],
+        )
+
+    def test_movie_session_cant_move_away_from_sold_tickets(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.client.force_authenticate(admin)
+        cinema_hall = CinemaHall.objects.create(
+            name="Red", rows=12, seats_in_row=10
+        )
+
+        res = self.client.patch(
+            detail_url(self.movie_session.id),
+            {"cinema_hall": cinema_hall.id},
+        )
+        self.movie_session.refresh_from_db()
+
+        self.assertEqual(res.status_code, 400)
+        self.assertNotEqual(self.movie_session.cinema_hall, cinema_hall)
+
+    def test_resized_cinema_hall_rebuilds_seat_map(self):
+        cinema_hall = self.movie_session.cinema_hall
+        cinema_hall.rows = 11
+        cinema_hall.seats_in_row = 13
+        with self.captureOnCommitCallbacks(execute=True):
+            cinema_hall.save()
+        res = self.client.get(detail_url(self.movie_session.id))
+
+        self.assertEqual(
+            res.data["taken_places"],
+            [
+                {"row": 1, "seat": 12},
+                {"row": 3, "seat": 4},
+                {"row": 10, "seat": 12},
+            ],
+        )
+        self.assertEqual(res.data["cinema_hall"]["capacity"], 143)
+
+    def test_cinema_hall_cant_shrink_under_sold_tickets(self):
+        cinema_hall = self.movie_session.cinema_hall
+        cinema_hall.seats_in_row = 11
+
+        with self.assertRaises(ValidationError):
+            cinema_hall.full_clean()
+
+    def test_reconcile_fixes_drifted_counter(self):
+        MovieSession.objects.filter(id=self.movie_session.id).update(
+            tickets_sold=0, taken_seats=b""
+        )
+
+        call_command("reconcile_movie_sessions", stdout=StringIO())
+        self.movie_session.refresh_from_db()
+
+        self.assertEqual(self.movie_session.tickets_sold, 3)
+        self.assertTrue(self.movie_session.seat_map.is_taken(3, 4))
+
+    def test_list_runs_plain_scan(self):
+        with self.assertNumQueries(1):
+            self.client.get(MOVIE_SESSION_URL)
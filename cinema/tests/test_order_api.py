@@ -0,0 +1,169 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import Order, Ticket
+from cinema.tests.test_movie_api import sample_movie_session
+
+ORDER_URL = reverse("cinema:order-list")
+
+
+
+def order_payload(movie_session, places):
+    return {
+        "tickets": [
+            {"row": row, "seat": seat, "movie_session": movie_session.id}
+            for row, seat in places
+        ]
+    }
+
+
+class OrderCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session(rows=10, seats_in_row=10)
+
+    def test_create_order_books_all_tickets(self):
+        places = [(1, seat) for seat in range(1, 11)]
+        res = self.client.post(
+            ORDER_URL, order_payload(self.movie_session, places), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(
+            sorted(order.tickets.values_list("row", "seat")), places
+        )
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        places = [(2, seat) for seat in range(1, 11)]
+        # session lookup, hold and ticket checks, savepoint, session
+        # lock, hold check under the lock, order, tickets, seat map
+        # update, holds of the customer, release savepoint and tickets
+        # for the response
+        with self.assertNumQueries(12):
+            res = self.client.post(
+                ORDER_URL,
+                order_payload(self.movie_session, places),
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_order_with_seat_out_of_range(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.movie_session, [(1, 1), (1, 11)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_with_taken_seat(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            movie_session=self.movie_session, order=order, row=1, seat=2
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.movie_session, [(1, 1), (1, 2)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_order_with_duplicated_seat(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.movie_session, [(1, 1), (1, 1)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_with_malformed_movie_session(self):
+        for movie_session in [[self.movie_session.id], {}, True]:
+            with self.subTest(movie_session=movie_session):
+                res = self.client.post(
+                    ORDER_URL,
+                    {
+                        "tickets": [
+                            {"row": 1, "seat": 1, "movie_session": movie_session}
+                        ]
+                    },
+                    format="json",
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("movie_session", res.data["tickets"][0])
+        self.assertFalse(Ticket.objects.exists())
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_orders(self, count):
+        for _ in range(count):
+            movie_session = sample_movie_session(rows=10, seats_in_row=10)
+            order = Order.objects.create(user=self.user)
+            for seat in range(1, 4):
+                Ticket.objects.create(
+                    movie_session=movie_session, order=order, row=1, seat=seat
+                )
+
+    def test_list_orders_query_count_is_constant(self):
+        self.create_orders(12)
+
+        # count, orders and tickets with their sessions, movies and halls
+        with self.assertNumQueries(3):
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 10)
+
+        # the same without the count for a cursor
+        with self.assertNumQueries(2):
+            res = self.client.get(ORDER_URL, {"cursor": ""})
+
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_list_orders_shows_tickets_available(self):
+        self.create_orders(1)
+
+        res = self.client.get(ORDER_URL)
+
+        tickets = res.data["results"][0]["tickets"]
+        self.assertEqual(len(tickets), 3)
+        for ticket in tickets:
+            self.assertEqual(ticket["movie_session"]["tickets_available"], 97)
+
+    def test_list_orders_only_of_current_user(self):
+        other_user = get_user_model().objects.create_user(
+            "other@myproject.com", "password"
+        )
+        Order.objects.create(user=other_user)
+        self.create_orders(1)
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 1)
@@ -0,0 +1,182 @@
+import os
+import random
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema import booking
+from cinema.models import CinemaHall, Movie, MovieSession, Order, Ticket
+from cinema.tests.test_movie_api import sample_movie_session
+from cinema.tests.test_order_api import ORDER_URL, order_payload
+
+# p99 latency in seconds concurrent orders have to stay under, wall-clock
+# timings depend on the machine, so it's only checked when set
+ORDER_P99_BUDGET = float(os.environ.get("ORDER_P99_BUDGET", 0))
+
+
+class OrderConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session(rows=10, seats_in_row=10)
+
+    def test_seats_sold_after_validation_conflict(self):
+        def sell_seat(tickets, error_to_raise, user_id=None):
+            Ticket.objects.create(
+                movie_session=self.movie_session,
+                order=Order.objects.create(user=self.user),
+                row=1,
+                seat=2,
+            )
+
+        with mock.patch(
+            "cinema.serializers.validate_tickets", side_effect=sell_seat
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                order_payload(self.movie_session, [(1, 1), (1, 2)]),
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"movie_session": self.movie_session.id, "row": 1, "seat": 2}],
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    @override_settings(ORDER_CREATE_BACKOFF=0)
+    def test_locked_database_is_retried(self):
+        place_order = booking._place_order
+        attempts = []
+
+        def locked_once(*args):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise OperationalError("database is locked")
+            return place_order(*args)
+
+        with mock.patch.object(
+            booking, "_place_order", side_effect=locked_once
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                order_payload(self.movie_session, [(1, 1)]),
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    @override_settings(ORDER_CREATE_ATTEMPTS=2, ORDER_CREATE_BACKOFF=0)
+    def test_gives_up_after_the_last_attempt(self):
+        with mock.patch.object(
+            booking,
+            "_place_order",
+            side_effect=OperationalError("database is locked"),
+        ) as place_order, self.assertRaises(OperationalError):
+            booking.place_order([], user=self.user)
+
+        self.assertEqual(place_order.call_count, 2)
+
+
+class OrderStressTests(TransactionTestCase):
+    THREADS = 4
+    ORDER_SIZE = 4
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                f"user{index}@myproject.com", "password"
+            )
+            for index in range(self.THREADS)
+        ]
+        self.movie_session = MovieSession.objects.create(
+            show_time="2022-06-02 14:00:00",
+            movie=Movie.objects.create(
+                title="Premiere", description="Description", duration=90
+            ),
+            cinema_hall=CinemaHall.objects.create(
+                name="Grand", rows=50, seats_in_row=40
+            ),
+        )
+
+    def book_all_seats(self, user, latencies, failures):
+        # every thread tries every block of seats in its own order,
+        # so each block is fought over by all of them
+        movie_session = MovieSession.objects.select_related(
+            "cinema_hall"
+        ).get(id=self.movie_session.id)
+        blocks = [
+            [
+                {"movie_session": movie_session, "row": row, "seat": seat}
+                for seat in range(first, first + self.ORDER_SIZE)
+            ]
+            for row in range(1, 51)
+            for first in range(1, 41, self.ORDER_SIZE)
+        ]
+        random.shuffle(blocks)
+        try:
+            for tickets_data in blocks:
+                started = time.perf_counter()
+                try:
+                    booking.place_order(tickets_data, user=user)
+                except booking.SeatsUnavailable:
+                    pass
+                latencies.append(time.perf_counter() - started)
+        except Exception as error:
+            failures.append(error)
+        finally:
+            connection.close()
+
+    def book_concurrently(self):
+        latencies = []
+        failures = []
+        threads = [
+            threading.Thread(
+                target=self.book_all_seats,
+                args=(user, latencies, failures),
+            )
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        return sorted(latencies)
+
+    @override_settings(ORDER_CREATE_ATTEMPTS=50)
+    def test_concurrent_orders_never_double_book(self):
+        self.book_concurrently()
+
+        places = list(
+            Ticket.objects.values_list("movie_session", "row", "seat")
+        )
+        self.assertEqual(len(places), 2000)
+        self.assertEqual(len(set(places)), 2000)
+        self.assertEqual(
+            Order.objects.count(), 2000 // self.ORDER_SIZE
+        )
+        self.movie_session.refresh_from_db()
+        self.assertEqual(self.movie_session.tickets_sold, 2000)
+        self.assertEqual(self.movie_session.seat_map.taken_count, 2000)
+
+    @skipUnless(ORDER_P99_BUDGET, "ORDER_P99_BUDGET isn't set")
+    @override_settings(ORDER_CREATE_ATTEMPTS=50)
+    def test_concurrent_orders_latency(self):
+        latencies = self.book_concurrently()
+
+        p99 = latencies[int(len(latencies) * 0.99)]
+        self.assertLess(p99, ORDER_P99_BUDGET)
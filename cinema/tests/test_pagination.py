@@ -0,0 +1,117 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from cinema.cache import catalog_cache
+from cinema.models import Movie, MovieSession, CinemaHall, Order
+
+MOVIE_URL = reverse("cinema:movie-list")
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+ORDER_URL = reverse("cinema:order-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+
+    def collect_pages(self, url, params):
+        ids, res = [], self.client.get(url, params)
+        while True:
+            ids.extend(item["id"] for item in res.data["results"])
+            if not res.data["next"]:
+                return ids, res
+            res = self.client.get(res.data["next"])
+
+    def test_movies_without_cursor_are_not_paginated(self):
+        Movie.objects.create(title="A", description="", duration=90)
+
+        res = self.client.get(MOVIE_URL)
+
+        self.assertIsInstance(res.data, list)
+
+    def test_tampered_cursor_is_not_found(self):
+        Movie.objects.create(title="A", description="", duration=90)
+
+        for position in [
+            "notjson",
+            "[]",
+            "[1]",
+            '["x", "y"]',
+            '["A", 1, 2]',
+            '{"title": "A"}',
+            '[["A"], 1]',
+        ]:
+            with self.subTest(position=position):
+                cursor = b64encode(
+                    urlencode({"o": 0, "p": position}).encode()
+                ).decode()
+
+                res = self.client.get(MOVIE_URL, {"cursor": cursor})
+
+                self.assertEqual(res.status_code, 404)
+
+    def test_movies_pages_with_equal_titles(self):
+        for title in ["B", "A", "B", "C", "B", "A", "B"]:
+            Movie.objects.create(title=title, description="", duration=90)
+        expected = list(
+            Movie.objects.order_by("title", "id").values_list("id", flat=True)
+        )
+
+        ids, last_page = self.collect_pages(MOVIE_URL, {"page_size": 2})
+
+        self.assertEqual(ids, expected)
+        previous_page = self.client.get(last_page.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in previous_page.data["results"]],
+            expected[-3:-1],
+        )
+
+    def test_movie_sessions_pages_with_equal_show_times(self):
+        movie = Movie.objects.create(title="A", description="", duration=90)
+        cinema_hall = CinemaHall.objects.create(
+            name="Blue", rows=10, seats_in_row=10
+        )
+        for show_time in ["2022-06-02 14:00", "2022-06-03 14:00"] * 3:
+            MovieSession.objects.create(
+                show_time=show_time, movie=movie, cinema_hall=cinema_hall
+            )
+        expected = list(
+            MovieSession.objects.order_by("-show_time", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        ids, _ = self.collect_pages(MOVIE_SESSION_URL, {"page_size": 4})
+
+        self.assertEqual(ids, expected)
+
+    def test_orders_are_paginated_by_cursor(self):
+        for _ in range(25):
+            Order.objects.create(user=self.user)
+
+        ids, res = self.collect_pages(ORDER_URL, {"cursor": ""})
+
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertNotIn("count", res.data)
+
+    def test_orders_keep_page_numbers_without_cursor(self):
+        for _ in range(25):
+            Order.objects.create(user=self.user)
+
+        res = self.client.get(ORDER_URL, {"page": 3})
+
+        self.assertEqual(res.data["count"], 25)
+        self.assertEqual(len(res.data["results"]), 5)
+        self.assertIsNone(res.data["next"])
+        self.assertIn("page=2", res.data["previous"])
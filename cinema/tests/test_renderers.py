@@ -0,0 +1,115 @@
+import datetime
+import decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from cinema import renderers
+from cinema.cache import catalog_cache
+from cinema.fragments import EncodedDict, fragment_cache
+from cinema.models import CinemaHall, Genre, Movie, MovieSession
+from cinema.renderers import FastJSONRenderer
+from cinema.serializers import GenreSerializer, MovieSessionDetailSerializer
+
+PAYLOAD = {
+    "text": "Ciné \u2028\u2029 \"quoted\" / slash",
+    "lazy": gettext_lazy("Not found."),
+    "when": datetime.datetime(2022, 6, 2, 14, 30),
+    "price": decimal.Decimal("9.50"),
+    "nested": ReturnDict({"list": [1, 2.5, None, True]}, serializer=None),
+    "fragment": EncodedDict({"id": 1, "name": "Drama"}),
+    1: "integer key",
+}
+
+
+class FastJSONRendererTests(TestCase):
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD)
+        )
+
+    def test_fallbacks_match_json_renderer(self):
+        for backend in ("orjson", "ujson"):
+            with mock.patch.object(renderers, backend, None):
+                self.assertEqual(
+                    FastJSONRenderer().render(PAYLOAD),
+                    JSONRenderer().render(PAYLOAD),
+                )
+
+    def test_indented_output_is_left_to_json_renderer(self):
+        content = FastJSONRenderer().render(
+            {"id": 1}, "application/json; indent=2"
+        )
+
+        self.assertEqual(content, b'{\n  "id": 1\n}')
+
+    def test_is_the_default_renderer(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("user@cinema.com", "pass")
+        )
+
+        res = client.get(reverse("cinema:genre-list"))
+
+        self.assertIsInstance(res.accepted_renderer, FastJSONRenderer)
+
+
+class PreEncodedFragmentTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        fragment_cache.clear()
+        self.genre = Genre.objects.create(name="Drama")
+
+    def test_representation_is_reused_until_invalidated(self):
+        first = GenreSerializer(self.genre).data
+        with mock.patch(
+            "rest_framework.serializers.ModelSerializer.to_representation"
+        ) as to_representation:
+            self.assertEqual(GenreSerializer(self.genre).data, first)
+        to_representation.assert_not_called()
+
+        self.genre.name = "Comedy"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.save()
+
+        self.assertEqual(
+            GenreSerializer(self.genre).data,
+            {"id": self.genre.id, "name": "Comedy"},
+        )
+
+    def test_representation_expires_after_ttl(self):
+        with mock.patch.object(fragment_cache, "ttl", 0):
+            GenreSerializer(self.genre).data
+        Genre.objects.filter(id=self.genre.id).update(name="Comedy")
+        self.genre.refresh_from_db()
+
+        self.assertEqual(
+            GenreSerializer(self.genre).data,
+            {"id": self.genre.id, "name": "Comedy"},
+        )
+
+    def test_nested_fragments_are_spliced_into_detail(self):
+        movie = Movie.objects.create(
+            title="Movie", description="Description", duration=90
+        )
+        movie.genres.add(self.genre)
+        movie_session = MovieSession.objects.create(
+            show_time="2022-06-02 14:00:00",
+            movie=movie,
+            cinema_hall=CinemaHall.objects.create(
+                name="Blue", rows=5, seats_in_row=6
+            ),
+        )
+
+        data = MovieSessionDetailSerializer(movie_session).data
+
+        self.assertIsInstance(data["cinema_hall"], EncodedDict)
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
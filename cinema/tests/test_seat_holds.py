@@ -0,0 +1,250 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema import booking
+from cinema.models import Order, SeatHold, Ticket
+from cinema.tests.test_movie_api import sample_movie_session
+from cinema.tests.test_order_api import ORDER_URL, order_payload
+
+
+def holds_url(movie_session):
+    return reverse("cinema:moviesession-holds", args=[movie_session.id])
+
+
+def seats_payload(places):
+    return {"seats": [{"row": row, "seat": seat} for row, seat in places]}
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session(rows=10, seats_in_row=10)
+
+    def hold_for_other_user(self, places, expires_in=60):
+        SeatHold.objects.bulk_create(
+            SeatHold(
+                movie_session=self.movie_session,
+                user=self.other_user,
+                row=row,
+                seat=seat,
+                expires_at=timezone.now() + timedelta(seconds=expires_in),
+            )
+            for row, seat in places
+        )
+
+    def test_hold_seats(self):
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 2), (1, 1), (1, 2)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["seats"], [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}]
+        )
+        self.assertIsNotNone(res.data["expires_at"])
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_holding_again_renews_own_holds(self):
+        for _ in range(2):
+            res = self.client.post(
+                holds_url(self.movie_session),
+                seats_payload([(1, 1)]),
+                format="json",
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=2)
+    def test_seats_held_per_user_are_capped(self):
+        self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1)]),
+            format="json",
+        )
+
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 2), (1, 3)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            list(
+                SeatHold.objects.filter(user=self.user).values_list(
+                    "row", "seat"
+                )
+            ),
+            [(1, 1)],
+        )
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=2)
+    def test_renewals_count_once_against_the_cap(self):
+        for places in ([(1, 1), (1, 2)], [(1, 2), (1, 1)]):
+            res = self.client.post(
+                holds_url(self.movie_session),
+                seats_payload(places),
+                format="json",
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(SEAT_HOLD_TTL=60, SEAT_HOLD_MAX_LIFETIME=120)
+    def test_renewals_stop_at_max_lifetime(self):
+        held_since = timezone.now() - timedelta(seconds=90)
+        SeatHold.objects.create(
+            movie_session=self.movie_session,
+            user=self.user,
+            row=1,
+            seat=1,
+            held_since=held_since,
+            expires_at=held_since + timedelta(seconds=100),
+        )
+
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1), (1, 2)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        renewed = SeatHold.objects.get(row=1, seat=1)
+        self.assertEqual(renewed.held_since, held_since)
+        self.assertEqual(
+            renewed.expires_at, held_since + timedelta(seconds=120)
+        )
+        self.assertEqual(
+            res.data["expires_at"], renewed.expires_at.isoformat()
+        )
+        self.assertGreater(
+            SeatHold.objects.get(row=1, seat=2).expires_at,
+            renewed.expires_at,
+        )
+
+    def test_seats_held_by_others_or_sold_conflict(self):
+        self.hold_for_other_user([(1, 2)])
+        Ticket.objects.create(
+            movie_session=self.movie_session,
+            order=Order.objects.create(user=self.other_user),
+            row=1,
+            seat=3,
+        )
+
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1), (1, 2), (1, 3)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"], [{"row": 1, "seat": 2}, {"row": 1, "seat": 3}]
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_expired_holds_are_free(self):
+        self.hold_for_other_user([(1, 1)], expires_in=-1)
+
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_seat_out_of_range(self):
+        res = self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(11, 1)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_holds(self):
+        self.hold_for_other_user([(1, 2)])
+        self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1)]),
+            format="json",
+        )
+
+        res = self.client.delete(holds_url(self.movie_session))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(SeatHold.objects.get().user, self.other_user)
+
+    def test_order_turns_holds_into_tickets(self):
+        self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1), (1, 2)]),
+            format="json",
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.movie_session, [(1, 1), (1, 2)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_place_order_for_user_takes_own_holds(self):
+        self.client.post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1)]),
+            format="json",
+        )
+
+        order = booking.place_order(
+            [{"movie_session": self.movie_session, "row": 1, "seat": 1}],
+            user=self.user,
+        )
+
+        self.assertEqual(order.tickets.get().seat, 1)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_order_of_seat_held_by_other_user_is_rejected(self):
+        self.hold_for_other_user([(1, 2)])
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.movie_session, [(1, 1), (1, 2)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_anonymous_user_cannot_hold(self):
+        res = APIClient().post(
+            holds_url(self.movie_session),
+            seats_payload([(1, 1)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,78 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cinema.cache import catalog_cache
+from cinema.models import Actor, CinemaHall, Genre, Movie, MovieSession
+from cinema.views import MovieViewSet
+
+MOVIE_URL = reverse("cinema:movie-list")
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+
+
+class StreamingListTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+
+        hall = CinemaHall.objects.create(name="Blue", rows=5, seats_in_row=6)
+        genre = Genre.objects.create(name="Drama")
+        for index in range(5):
+            movie = Movie.objects.create(
+                title=f"Movie {index}",
+                description="Description",
+                duration=90,
+            )
+            movie.genres.add(genre)
+            movie.actors.add(
+                Actor.objects.create(first_name="Ann", last_name=f"{index}")
+            )
+            MovieSession.objects.create(
+                show_time=f"2022-06-0{index + 1} 14:00:00",
+                movie=movie,
+                cinema_hall=hall,
+            )
+
+    def test_stream_param_gives_same_json_as_list(self):
+        for url in (MOVIE_URL, MOVIE_SESSION_URL):
+            res = self.client.get(url)
+            streamed = self.client.get(url, {"stream": "1"})
+
+            self.assertTrue(streamed.streaming)
+            self.assertEqual(streamed["Content-Type"], "application/json")
+            self.assertEqual(b"".join(streamed.streaming_content), res.content)
+
+    def test_empty_stream_is_empty_array(self):
+        streamed = self.client.get(MOVIE_URL, {"stream": "1", "genres": "0"})
+
+        self.assertEqual(b"".join(streamed.streaming_content), b"[]")
+
+    def test_ndjson_accept_header_streams_one_object_per_line(self):
+        res = self.client.get(MOVIE_SESSION_URL, {"movie": "2"})
+        streamed = self.client.get(
+            MOVIE_SESSION_URL,
+            {"movie": "2"},
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+
+        self.assertEqual(streamed["Content-Type"], "application/x-ndjson")
+        lines = b"".join(streamed.streaming_content).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], res.json())
+
+    def test_rows_are_prefetched_per_chunk(self):
+        with mock.patch.object(MovieViewSet, "stream_chunk_size", 2):
+            streamed = self.client.get(MOVIE_URL, {"stream": "1"})
+            # one cursor over movies, genres and actors of each of 3 chunks
+            with self.assertNumQueries(7):
+                rows = json.loads(b"".join(streamed.streaming_content))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[4]["genres"], ["Drama"])
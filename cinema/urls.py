@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from cinema import async_views
 from cinema.views import (
     GenreViewSet,
     ActorViewSet,
@@ -18,6 +19,28 @@ router.register("movies", MovieViewSet)
 router.register("movie_sessions", MovieSessionViewSet)
 router.register("orders", OrderViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "async/movies/",
+        async_views.movie_list,
+        name="movie-list-async",
+    ),
+    path(
+        "async/movies/<int:pk>/",
+        async_views.movie_detail,
+        name="movie-detail-async",
+    ),
+    path(
+        "async/movie_sessions/",
+        async_views.movie_session_list,
+        name="moviesession-list-async",
+    ),
+    path(
+        "async/movie_sessions/<int:pk>/",
+        async_views.movie_session_detail,
+        name="moviesession-detail-async",
+    ),
+]
 
 app_name = "cinema"
@@ -1,15 +1,38 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from django.db.models import F, Count
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
+from rest_framework_simplejwt.authentication import (
+    JWTStatelessUserAuthentication,
+)
 
-from cinema.models import Genre, Actor, CinemaHall, Movie, MovieSession, Order
+from cinema import search
+from cinema.booking import (
+    SeatHoldLimitExceeded,
+    SeatsUnavailable,
+    hold_seats,
+    release_holds,
+)
+from cinema.cache import CachedListModelMixin, CachedRetrieveModelMixin
+from cinema.models import (
+    Genre,
+    Actor,
+    CinemaHall,
+    Movie,
+    MovieSession,
+    Order,
+    Ticket,
+)
+from cinema.pagination import (
+    CatalogPagination,
+    PageNumberOrKeysetPagination,
+)
 from cinema.permissions import IsAdminOrIfAuthenticatedReadOnly
 
 from cinema.serializers import (
@@ -21,56 +44,95 @@ from cinema.serializers import (
     MovieSessionListSerializer,
     MovieDetailSerializer,
     MovieSessionDetailSerializer,
+    MovieSessionSeatMapDetailSerializer,
     MovieListSerializer,
     OrderSerializer,
     OrderListSerializer,
     MovieImageSerializer,
+    SeatHoldSerializer,
 )
+from cinema.streaming import StreamingListModelMixin
+from cinema_service.instrumentation import SerializationTimingMixin
+from user.authentication import CachedTokenAuthentication
+
+
+def seats_conflict(places, fields):
+    """409 listing the places, as tuples of the fields, that were sold
+    or held by another customer"""
+    return Response(
+        {
+            "detail": "Some of the seats are not available.",
+            "seats": [dict(zip(fields, place)) for place in places],
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
 
 
 class GenreViewSet(
+    SerializationTimingMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    CachedListModelMixin,
     GenericViewSet,
 ):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "genres"
 
 
 class ActorViewSet(
+    SerializationTimingMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    CachedListModelMixin,
     GenericViewSet,
 ):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "actors"
 
 
 class CinemaHallViewSet(
+    SerializationTimingMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    CachedListModelMixin,
     GenericViewSet,
 ):
     queryset = CinemaHall.objects.all()
     serializer_class = CinemaHallSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "cinema_halls"
 
 
 class MovieViewSet(
-    mixins.ListModelMixin,
+    SerializationTimingMixin,
+    StreamingListModelMixin,
+    CachedListModelMixin,
     mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
+    CachedRetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Movie.objects.prefetch_related("genres", "actors")
     serializer_class = MovieSerializer
-    authentication_classes = (TokenAuthentication,)
+    pagination_class = CatalogPagination
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "movies"
 
     @staticmethod
     def _params_to_ints(qs):
@@ -82,12 +144,16 @@ class MovieViewSet(
         title = self.request.query_params.get("title")
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
+        query = self.request.query_params.get("search")
 
         queryset = self.queryset
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
+        if query:
+            queryset = search.search(queryset, query)
+
         if genres:
             genres_ids = self._params_to_ints(genres)
             queryset = queryset.filter(genres__id__in=genres_ids)
@@ -128,30 +194,36 @@ class MovieViewSet(
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MovieSessionViewSet(viewsets.ModelViewSet):
-    queryset = (
-        MovieSession.objects.all()
-        .select_related("movie", "cinema_hall")
-        .annotate(
-            tickets_available=(
-                F("cinema_hall__rows") * F("cinema_hall__seats_in_row")
-                - Count("tickets")
-            )
-        )
+class MovieSessionViewSet(
+    SerializationTimingMixin,
+    StreamingListModelMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = MovieSession.objects.all().select_related(
+        "movie", "cinema_hall"
     )
     serializer_class = MovieSessionSerializer
-    authentication_classes = (TokenAuthentication,)
+    pagination_class = CatalogPagination
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
         date = self.request.query_params.get("date")
         movie_id_str = self.request.query_params.get("movie")
 
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+            day_start = datetime.strptime(date, "%Y-%m-%d")
+            if settings.USE_TZ:
+                day_start = timezone.make_aware(day_start)
+            queryset = queryset.filter(
+                show_time__gte=day_start,
+                show_time__lt=day_start + timedelta(days=1),
+            )
 
         if movie_id_str:
             queryset = queryset.filter(movie_id=int(movie_id_str))
@@ -163,31 +235,88 @@ class MovieSessionViewSet(viewsets.ModelViewSet):
             return MovieSessionListSerializer
 
         if self.action == "retrieve":
+            if self.request.query_params.get("taken_places") == "bitmap":
+                return MovieSessionSeatMapDetailSerializer
+
             return MovieSessionDetailSerializer
 
+        if self.action == "holds":
+            return SeatHoldSerializer
+
         return MovieSessionSerializer
 
+    @action(
+        methods=["POST", "DELETE"],
+        detail=True,
+        permission_classes=[IsAuthenticated],
+    )
+    def holds(self, request, pk=None):
+        """Hold seats of the movie session for the current user
+        or release all of them"""
+        movie_session = self.get_object()
+        if request.method == "DELETE":
+            release_holds(movie_session.id, request.user.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        context = self.get_serializer_context()
+        context["movie_session"] = movie_session
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        places = sorted(
+            {
+                (place["row"], place["seat"])
+                for place in serializer.validated_data["seats"]
+            }
+        )
+        try:
+            holds = hold_seats(movie_session.id, request.user.id, places)
+        except SeatsUnavailable as error:
+            return seats_conflict(error.places, ("row", "seat"))
+        except SeatHoldLimitExceeded as error:
+            return Response(
+                {"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            SeatHoldSerializer(
+                {
+                    "seats": holds,
+                    "expires_at": min(hold.expires_at for hold in holds),
+                }
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
 
-class OrderPagination(PageNumberPagination):
+class OrderPagination(PageNumberOrKeysetPagination):
     page_size = 10
     max_page_size = 100
 
 
 class OrderViewSet(
+    SerializationTimingMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
 ):
     queryset = Order.objects.prefetch_related(
-        "tickets__movie_session__movie", "tickets__movie_session__cinema_hall"
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "movie_session__movie", "movie_session__cinema_hall"
+            ),
+        )
     )
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        CachedTokenAuthentication,
+        JWTStatelessUserAuthentication,
+    )
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -195,5 +324,14 @@ class OrderViewSet(
 
         return OrderSerializer
 
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except SeatsUnavailable as error:
+            # sold or held by a concurrent order after validation
+            return seats_conflict(
+                error.places, ("movie_session", "row", "seat")
+            )
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
@@ -0,0 +1,132 @@
+"""
+Database profiles picked from the environment.
+
+SQLite stays the default, so development and the test suite need no
+setup. Its connections are tuned with SQLITE_PRAGMAS unless
+DATABASE_SQLITE_TUNING=0, and DATABASE_BUSY_TIMEOUT sets how many
+milliseconds a writer waits for the lock.
+
+DATABASE_ENGINE=postgresql switches to PostgreSQL, which needs the
+psycopg package, with psycopg[pool] for DATABASE_POOL:
+
+    DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD,
+    DATABASE_HOST, DATABASE_PORT    connection of the primary
+    DATABASE_CONN_MAX_AGE           seconds to keep connections open
+    DATABASE_POOL                   "1" to use a psycopg connection pool
+                                    instead of persistent connections
+    DATABASE_POOL_MIN_SIZE,
+    DATABASE_POOL_MAX_SIZE          bounds of the pool of each process
+    DATABASE_REPLICA_HOSTS          comma separated hosts of read replicas,
+                                    added as replica_1, replica_2, ...
+"""
+
+import os
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+REPLICA_PREFIX = "replica_"
+
+SQLITE_PRAGMAS = {
+    # readers see the last commit instead of waiting for the writer
+    "journal_mode": "WAL",
+    # with WAL, fsync only at checkpoints, a power loss may drop the last
+    # commits but never corrupts the database
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # negative sizes are in KiB
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+}
+
+
+def sqlite_init_command(pragmas):
+    return ";".join(
+        f"PRAGMA {name}={value}" for name, value in pragmas.items()
+    )
+
+
+def _sqlite(base_dir, environ):
+    database = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": environ.get("DATABASE_NAME", base_dir / "db.sqlite3"),
+    }
+    if environ.get("DATABASE_SQLITE_TUNING", "1") == "1":
+        pragmas = dict(SQLITE_PRAGMAS)
+        pragmas["busy_timeout"] = int(
+            environ.get("DATABASE_BUSY_TIMEOUT", pragmas["busy_timeout"])
+        )
+        database["OPTIONS"] = {"init_command": sqlite_init_command(pragmas)}
+    return database
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """transaction.atomic() that takes the write lock of SQLite at BEGIN.
+
+    A deferred transaction that reads before writing fails right away
+    with "database is locked" when another connection started writing
+    meanwhile, as waiting could deadlock. BEGIN IMMEDIATE waits for the
+    lock up to the busy timeout instead. Other databases, and blocks
+    nested in a transaction, get a plain atomic block.
+    """
+    connection = transaction.get_connection(using)
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # a new connection would reset the mode from the settings
+    connection.ensure_connection()
+    transaction_mode = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = transaction_mode
+            yield
+    finally:
+        connection.transaction_mode = transaction_mode
+
+
+def _postgresql(environ):
+    database = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": environ.get("DATABASE_NAME", "cinema_service"),
+        "USER": environ.get("DATABASE_USER", "postgres"),
+        "PASSWORD": environ.get("DATABASE_PASSWORD", ""),
+        "HOST": environ.get("DATABASE_HOST", "localhost"),
+        "PORT": environ.get("DATABASE_PORT", "5432"),
+        "CONN_MAX_AGE": int(environ.get("DATABASE_CONN_MAX_AGE", 60)),
+        # a persistent connection dropped by the server is replaced at
+        # the start of the next request instead of failing it
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    if environ.get("DATABASE_POOL") == "1":
+        # the pool keeps the connections, Django must not hold them
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"]["pool"] = {
+            "min_size": int(environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(environ.get("DATABASE_POOL_MAX_SIZE", 10)),
+        }
+    return database
+
+
+def database_settings(base_dir, environ=os.environ):
+    """DATABASES for the profile selected by DATABASE_ENGINE"""
+    if environ.get("DATABASE_ENGINE", "sqlite") != "postgresql":
+        return {DEFAULT_DB_ALIAS: _sqlite(base_dir, environ)}
+
+    primary = _postgresql(environ)
+    databases = {DEFAULT_DB_ALIAS: primary}
+    replica_hosts = environ.get("DATABASE_REPLICA_HOSTS", "")
+    for index, host in enumerate(replica_hosts.split(","), start=1):
+        if host.strip():
+            databases[f"{REPLICA_PREFIX}{index}"] = {
+                **primary,
+                "OPTIONS": dict(primary["OPTIONS"]),
+                "HOST": host.strip(),
+                # tests read the primary through the replica aliases
+                "TEST": {"MIRROR": DEFAULT_DB_ALIAS},
+            }
+    return databases
@@ -0,0 +1,316 @@
+"""
+Lightweight per-view instrumentation for production.
+
+InstrumentationMiddleware records SQL query count, DB time, serializer
+time, response rendering time and total time of sampled requests, labels
+them with the DRF viewset action (e.g. ``MovieViewSet.list``), returns
+them in the ``Server-Timing`` header and aggregates them into in-process
+histograms served as JSON by ``metrics_view``.
+
+Serializer time is measured for views using SerializationTimingMixin,
+without the queries run while serializing, which count as DB time.
+"""
+
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+TIME_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        cumulative, buckets = 0, {}
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """Histograms of every measured metric per view label"""
+
+    metrics = {
+        "total_ms": TIME_BUCKETS_MS,
+        "db_ms": TIME_BUCKETS_MS,
+        "serialize_ms": TIME_BUCKETS_MS,
+        "render_ms": TIME_BUCKETS_MS,
+        "queries": QUERY_BUCKETS,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, label, values):
+        with self._lock:
+            histograms = self._views.setdefault(
+                label,
+                {
+                    metric: Histogram(buckets)
+                    for metric, buckets in self.metrics.items()
+                },
+            )
+            for metric, value in values.items():
+                histograms[metric].observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                label: {
+                    metric: histogram.as_dict()
+                    for metric, histogram in histograms.items()
+                }
+                for label, histograms in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+class _QueryTimer:
+    """Database execute wrapper counting queries and their duration"""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries += 1
+
+
+# timer of the measured request, copied by sync_to_async into the thread
+# running the ORM of async views, whose connections differ from the
+# connections of the event loop
+_current_timer = ContextVar("instrumentation_timer", default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def _install_query_timer(connection, **kwargs):
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+connection_created.connect(_install_query_timer)
+for _connection in connections.all(initialized_only=True):
+    _install_query_timer(_connection)
+
+
+def view_label(view_func, method):
+    """Viewset action like `MovieViewSet.list` or the view name"""
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__qualname__}"
+
+    actions = getattr(view_func, "actions", None) or {}
+    if method in actions:
+        return f"{view_class.__name__}.{actions[method]}"
+    return view_class.__name__
+
+
+class _TimedSerializer:
+    """Mixed into the class of a serializer to add the time spent in
+    `.data` to the measurements of its request"""
+
+    @property
+    def data(self):
+        measured = self._instrumentation
+        started = time.perf_counter()
+        db_started = measured["timer"].duration
+        try:
+            return super().data
+        finally:
+            measured["serialize"] += (
+                time.perf_counter()
+                - started
+                - (measured["timer"].duration - db_started)
+            )
+
+
+_timed_serializer_classes = {}
+
+
+def _timed_serializer_class(serializer_class):
+    if serializer_class not in _timed_serializer_classes:
+        _timed_serializer_classes[serializer_class] = type(
+            serializer_class.__name__,
+            (_TimedSerializer, serializer_class),
+            {},
+        )
+    return _timed_serializer_classes[serializer_class]
+
+
+class SerializationTimingMixin:
+    """GenericAPIView mixin measuring the serializers of sampled
+    requests as the serialize_ms metric"""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        measured = getattr(self.request, "_instrumentation", None)
+        if measured is not None:
+            serializer.__class__ = _timed_serializer_class(type(serializer))
+            serializer._instrumentation = measured
+        return serializer
+
+
+class InstrumentationMiddleware:
+    """Measure a share of INSTRUMENTATION_SAMPLE_RATE of the requests.
+
+    It runs natively under both WSGI and ASGI, so it doesn't push
+    async views through a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # a sync hook would be run through sync_to_async
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with self._measure(request):
+            response = self.get_response(request)
+        return self._record(request, response)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        with self._measure(request):
+            response = await self.get_response(request)
+        return self._record(request, response)
+
+    @contextmanager
+    def _measure(self, request):
+        timer = _QueryTimer()
+        request._instrumentation = {
+            "timer": timer,
+            "serialize": 0.0,
+            "render": 0.0,
+            "started": time.perf_counter(),
+        }
+        token = _current_timer.set(timer)
+        try:
+            yield
+        finally:
+            _current_timer.reset(token)
+
+    def _record(self, request, response):
+        measured = request._instrumentation
+        total = time.perf_counter() - measured["started"]
+        timer = measured["timer"]
+        values = {
+            "total_ms": total * 1000,
+            "db_ms": timer.duration * 1000,
+            "serialize_ms": measured["serialize"] * 1000,
+            "render_ms": measured["render"] * 1000,
+            "queries": timer.queries,
+        }
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None:
+            registry.record(
+                view_label(resolver_match.func, request.method.lower()),
+                values,
+            )
+
+        response["Server-Timing"] = (
+            f'db;dur={values["db_ms"]:.2f};desc="{timer.queries} queries", '
+            f'serialize;dur={values["serialize_ms"]:.2f}, '
+            f'render;dur={values["render_ms"]:.2f}, '
+            f'total;dur={values["total_ms"]:.2f}'
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        if not hasattr(request, "_instrumentation"):
+            return response
+        started = time.perf_counter()
+
+        def finish_render(rendered_response):
+            request._instrumentation["render"] = (
+                time.perf_counter() - started
+            )
+
+        response.add_post_render_callback(finish_render)
+        return response
+
+    async def _aprocess_template_response(self, request, response):
+        return InstrumentationMiddleware.process_template_response(
+            self, request, response
+        )
+
+
+def _may_read_metrics(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    authorization = request.headers.get("Authorization", "")
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        authorization, f"Bearer {settings.METRICS_TOKEN}"
+    )
+
+
+def metrics_view(request):
+    """Aggregated histograms, served to staff users and to scrapers
+    sending `Authorization: Bearer <METRICS_TOKEN>`"""
+    if not _may_read_metrics(request):
+        raise Http404
+    return JsonResponse(
+        {
+            "sample_rate": settings.INSTRUMENTATION_SAMPLE_RATE,
+            "views": registry.snapshot(),
+        }
+    )
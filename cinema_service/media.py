@@ -0,0 +1,158 @@
+"""
+Production-capable serving of uploaded media.
+
+serve_media answers conditional requests from strong ETags, serves
+single byte ranges and marks content-addressed files, whose names never
+change content, as immutable. Depending on MEDIA_SERVE_MODE it streams
+files with FileResponse, which servers send with sendfile() through
+wsgi.file_wrapper, or leaves sending them to the reverse proxy with
+X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd).
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+CONTENT_ADDRESSED_NAME = re.compile(r"(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}\.")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _FileRange:
+    """File-like reading `length` bytes of the file from `start`"""
+
+    def __init__(self, media_file, start, length):
+        media_file.seek(start)
+        self.media_file = media_file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.media_file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.media_file.close()
+
+
+def _etag(path, stats):
+    if CONTENT_ADDRESSED_NAME.search(path):
+        # the name is the SHA-256 of the content
+        return quote_etag(os.path.basename(path).split(".")[0])
+    return quote_etag(f"{stats.st_mtime_ns:x}-{stats.st_size:x}")
+
+
+def _byte_range(header, size):
+    """(start, end) of the requested range, None to send the whole file.
+
+    Malformed, invalid and multiple ranges are ignored as RFC 9110
+    allows, raises ValueError when the range can't be satisfied.
+    """
+    match = BYTE_RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - suffix_length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts after the end of the file")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _content_type(full_path):
+    content_type, _ = mimetypes.guess_type(full_path)
+    return content_type or "application/octet-stream"
+
+
+def _accel_response(path, full_path):
+    response = HttpResponse(content_type=_content_type(full_path))
+    if settings.MEDIA_SERVE_MODE == "x-accel-redirect":
+        response["X-Accel-Redirect"] = quote(
+            settings.MEDIA_ACCEL_PREFIX + path
+        )
+    else:
+        response["X-Sendfile"] = full_path
+    return response
+
+
+def _file_response(request, full_path, size, etag):
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and if_range in (None, etag):
+        try:
+            byte_range = _byte_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    media_file = open(full_path, "rb")
+    if byte_range is None:
+        return FileResponse(media_file, content_type=_content_type(full_path))
+
+    start, end = byte_range
+    response = FileResponse(
+        _FileRange(media_file, start, end - start + 1),
+        content_type=_content_type(full_path),
+        status=206,
+    )
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = end - start + 1
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stats = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404
+
+    etag = _etag(path, stats)
+    last_modified = int(stats.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if settings.MEDIA_SERVE_MODE == "django":
+            response = _file_response(request, full_path, stats.st_size, etag)
+        else:
+            # the proxy handles ranges itself
+            response = _accel_response(path, full_path)
+        if response.status_code == 416:
+            return response
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    if CONTENT_ADDRESSED_NAME.search(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    return response
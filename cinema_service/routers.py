@@ -0,0 +1,46 @@
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from cinema_service.database import REPLICA_PREFIX
+
+
+class PrimaryReplicaRouter:
+    """Send catalog reads to a random read replica and everything else,
+    writes included, to the primary.
+
+    Reads inside a transaction of the primary stay on it, so order
+    creation sees its own writes and locks, and related objects are
+    loaded from the database their instance came from.
+    """
+
+    def replicas(self):
+        return [
+            alias
+            for alias in connections.databases
+            if alias.startswith(REPLICA_PREFIX)
+        ]
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        replicas = self.replicas()
+        if replicas and model._meta.label_lower in settings.REPLICA_MODELS:
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from cinema_service.database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -51,7 +55,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "cinema_service.instrumentation.InstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -60,6 +64,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG:
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Share of requests measured by the instrumentation middleware
+INSTRUMENTATION_SAMPLE_RATE = 1.0
+# Bearer token of metrics scrapers, staff users may always read them
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 ROOT_URLCONF = "cinema_service.urls"
 
 TEMPLATES = [
@@ -84,11 +96,38 @@ WSGI_APPLICATION = "cinema_service.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
-DATABASES = {
+# SQLite unless DATABASE_ENGINE=postgresql, see cinema_service.database
+DATABASES = database_settings(BASE_DIR)
+
+DATABASE_ROUTERS = ["cinema_service.routers.PrimaryReplicaRouter"]
+
+# Models whose reads outside transactions are served by read replicas
+REPLICA_MODELS = {
+    "cinema.movie",
+    "cinema.moviesession",
+    "cinema.genre",
+    "cinema.actor",
+    "cinema.cinemahall",
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# The catalog cache holds the versions invalidating cached responses and
+# pre-encoded representations. Deployments running more than one process
+# need a shared backend (Redis, Memcached) for it, with LocMemCache a
+# process only sees its own changes until the entries expire.
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalog",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
 }
 
 
@@ -114,8 +153,72 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The first hasher hashes new passwords, the others only verify existing
+# hashes, which are rehashed with the first one on the next login, as are
+# hashes with other parameters of the same hasher.
+# Put TunedArgon2PasswordHasher first to switch to Argon2.
+PASSWORD_HASHERS = [
+    "user.hashers.TunedScryptPasswordHasher",
+    "user.hashers.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+# Scrypt work factor (N) and lanes (p) of TunedScryptPasswordHasher, one
+# of the OWASP minimums: as much CPU time as Django's N=2^14, p=5 with
+# 8 MiB instead of 16 MiB per hash, so concurrent logins need less memory
+PASSWORD_SCRYPT_WORK_FACTOR = 2**13
+PASSWORD_SCRYPT_PARALLELISM = 10
+
+# Threads verifying passwords of async logins
+PASSWORD_HASHING_WORKERS = 4
+
+# ModelBackend hashing the passwords of async logins in those threads
+AUTHENTICATION_BACKENDS = ["user.backends.ModelBackend"]
+
 AUTH_USER_MODEL = "user.User"
 
+REST_FRAMEWORK = {
+    # orjson or ujson when installed, stdlib json otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "cinema.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+SIMPLE_JWT = {
+    # Claims of access tokens are trusted without a database query,
+    # keep them short-lived
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsUser",
+}
+
+# Seconds a seat stays held for a customer before it's ordered, seats
+# a customer may hold at once per movie session, and seconds renewals
+# may keep a seat held in total
+SEAT_HOLD_TTL = 5 * 60
+SEAT_HOLD_MAX_SEATS = 10
+SEAT_HOLD_MAX_LIFETIME = 15 * 60
+
+# Attempts of an order colliding with concurrent ones and the base delay
+# in seconds of the exponential backoff between them
+ORDER_CREATE_ATTEMPTS = 5
+ORDER_CREATE_BACKOFF = 0.01
+
+# Seconds a process reuses a pre-encoded catalog representation at most
+CATALOG_FRAGMENT_TTL = 60
+
+# Token -> user resolutions kept in process by CachedTokenAuthentication.
+# Saving a user or deleting a token only drops the entries of the process
+# doing it, other processes keep resolving the old user or the deleted
+# token for up to TOKEN_CACHE_TTL seconds, set it to 0 to disable the cache
+# when revocations have to take effect everywhere at once.
+TOKEN_CACHE_MAX_SIZE = 10000
+TOKEN_CACHE_TTL = 60
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -136,6 +239,40 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# How cinema_service.media.serve_media sends files: "django" streams
+# them itself, "x-accel-redirect" (nginx) and "x-sendfile" (Apache,
+# lighttpd) let the reverse proxy send them
+MEDIA_SERVE_MODE = "django"
+# internal nginx location aliased to MEDIA_ROOT for x-accel-redirect
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # movie images, deduplicated by content
+    "movie_images": {
+        "BACKEND": "cinema.storage.ContentAddressedStorage",
+    },
+}
+
+# Stream every upload to a temporary file on disk, which storages then
+# move into place, instead of keeping small ones in memory
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Bounding boxes of the movie image renditions rendered after upload
+MOVIE_IMAGE_RENDITIONS = {
+    "thumbnail": (160, 240),
+    "medium": (480, 720),
+}
+MOVIE_IMAGE_FORMATS = ("webp", "jpeg")
+IMAGE_PROCESSING_WORKERS = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
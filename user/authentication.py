@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+class TokenCache:
+    """Bounded LRU of token key -> token with its user and a time to live.
+
+    Entries live in the process memory, so changes made by other
+    processes are only seen once the entry expires.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        with self._lock:
+            self._entries[key] = (token, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_user(self, user_id):
+        with self._lock:
+            for key in [
+                key
+                for key, (token, _) in self._entries.items()
+                if token.user_id == user_id
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication resolving known tokens without a query,
+    every request gets its own copy of the cached user"""
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is not None:
+            return copy.copy(token.user), token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, token)
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """authenticate() resolving unknown tokens with the async ORM"""
+        key = _TokenKey(self.keyword).authenticate(request)
+        if key is None:
+            return None
+
+        token = token_cache.get(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(
+                    key=key
+                )
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _("User inactive or deleted.")
+                )
+            token_cache.set(key, token)
+        return copy.copy(token.user), token
+
+
+class _TokenKey(TokenAuthentication):
+    """Only reads the key of the Authorization header
+    the way TokenAuthentication does"""
+
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def authenticate_credentials(self, key):
+        return key
+
+
+class ClaimsUser(TokenUser):
+    """User built from the id, email and is_staff claims of a JWT,
+    used by JWTStatelessUserAuthentication without a database query"""
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
@@ -0,0 +1,30 @@
+from django.contrib.auth import backends, get_user_model
+
+from user.hashers import amake_password
+
+
+class ModelBackend(backends.ModelBackend):
+    """ModelBackend whose async logins hash in the bounded hashing
+    thread pool instead of the event loop"""
+
+    async def aauthenticate(
+        self, request, username=None, password=None, **kwargs
+    ):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await user_model._default_manager.aget_by_natural_key(
+                username
+            )
+        except user_model.DoesNotExist:
+            # hash once anyway, so unknown emails take as long as known
+            await amake_password(password)
+            return None
+        if await user.acheck_password(password) and self.user_can_authenticate(
+            user
+        ):
+            return user
+        return None
@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    ScryptPasswordHasher,
+    make_password,
+    verify_password,
+)
+from django.core.exceptions import ImproperlyConfigured
+
+# OWASP's minimum lanes of scrypt with r=8 for each work factor, all of
+# them cost about the same CPU time and trade memory for lanes
+OWASP_SCRYPT_MINIMUM_PARALLELISM = {
+    2**17: 1,
+    2**16: 2,
+    2**15: 3,
+    2**14: 5,
+    2**13: 10,
+}
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt with the work factor and lanes of PASSWORD_SCRYPT_WORK_FACTOR
+    and PASSWORD_SCRYPT_PARALLELISM, refusing parameters below the OWASP
+    minimums"""
+
+    block_size = 8
+
+    def __init__(self):
+        minimum = OWASP_SCRYPT_MINIMUM_PARALLELISM.get(self.work_factor)
+        if minimum is None or self.parallelism < minimum:
+            raise ImproperlyConfigured(
+                f"scrypt with N={self.work_factor}, p={self.parallelism} "
+                "is below the OWASP minimums"
+            )
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with the OWASP minimum of 19 MiB and two passes"""
+
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
+
+
+_executor = None
+
+
+def _hashing_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            thread_name_prefix="password-hashing",
+        )
+    return _executor
+
+
+async def amake_password(password):
+    """make_password() run in the bounded hashing thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hashing_executor(), make_password, password
+    )
+
+
+async def acheck_password(password, encoded, setter=None):
+    """check_password() with the hash verified in the bounded hashing
+    thread pool, so slow hashers don't block the event loop"""
+    is_correct, must_update = await asyncio.get_running_loop().run_in_executor(
+        _hashing_executor(), verify_password, password, encoded
+    )
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
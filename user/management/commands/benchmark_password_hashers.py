@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.management.base import BaseCommand
+
+from user.hashers import acheck_password
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure password verifications (logins) per second per core "
+        "and through the async hashing thread pool for every hasher "
+        "in PASSWORD_HASHERS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=2.0,
+            help="Duration of every measurement",
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            "cpu_count": os.cpu_count(),
+            "workers": settings.PASSWORD_HASHING_WORKERS,
+            "hashers": {},
+        }
+        for path, hasher in zip(settings.PASSWORD_HASHERS, get_hashers()):
+            try:
+                encoded = make_password(BENCHMARK_PASSWORD, hasher=hasher)
+            except ValueError as error:
+                report["hashers"][path] = {"error": str(error)}
+                continue
+
+            report["hashers"][path] = {
+                "logins_per_second_per_core": self.per_core(
+                    hasher, encoded, options["seconds"]
+                ),
+                "logins_per_second_in_pool": asyncio.run(
+                    self.in_pool(encoded, options["seconds"])
+                ),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def per_core(hasher, encoded, seconds):
+        logins, started = 0, time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            hasher.verify(BENCHMARK_PASSWORD, encoded)
+            logins += 1
+        return round(logins / (time.perf_counter() - started), 2)
+
+    @staticmethod
+    async def in_pool(encoded, seconds):
+        logins, started = 0, time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            await asyncio.gather(
+                *[
+                    acheck_password(BENCHMARK_PASSWORD, encoded)
+                    for _ in range(settings.PASSWORD_HASHING_WORKERS)
+                ]
+            )
+            logins += settings.PASSWORD_HASHING_WORKERS
+        return round(logins / (time.perf_counter() - started), 2)
@@ -2,6 +2,8 @@ from django.db import models
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from user.hashers import acheck_password, amake_password
+
 
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
@@ -47,3 +49,24 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    async def acheck_password(self, raw_password):
+        """check_password() hashing in the bounded hashing thread pool"""
+
+        async def setter(raw_password):
+            self.password = await amake_password(raw_password)
+            # upgrading the hash isn't a password change
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await acheck_password(raw_password, self.password, setter)
+
+
+class RevokedToken(models.Model):
+    """Denylist entry of a revoked refresh token, kept until it expires"""
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
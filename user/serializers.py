@@ -1,6 +1,15 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import aauthenticate, authenticate, get_user_model
+from django.contrib.auth.models import update_last_login
+from django.utils import timezone
 from rest_framework import serializers
 from django.utils.translation import gettext as _
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.models import RevokedToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -37,19 +46,105 @@ class AuthTokenSerializer(serializers.Serializer):
 
         if email and password:
             user = authenticate(email=email, password=password)
-
-            if user:
-                if not user.is_active:
-                    msg = _("User account is disabled.")
-                    raise serializers.ValidationError(
-                        msg, code="authorization"
-                    )
-            else:
-                msg = _("Unable to log in with provided credentials.")
-                raise serializers.ValidationError(msg, code="authorization")
+            self.check_user(user)
         else:
             msg = _("Must include 'username' and 'password'.")
             raise serializers.ValidationError(msg, code="authorization")
 
         attrs["user"] = user
         return attrs
+
+    @staticmethod
+    def check_user(user):
+        if user:
+            if not user.is_active:
+                msg = _("User account is disabled.")
+                raise serializers.ValidationError(msg, code="authorization")
+        else:
+            msg = _("Unable to log in with provided credentials.")
+            raise serializers.ValidationError(msg, code="authorization")
+
+
+class AsyncAuthTokenSerializer(AuthTokenSerializer):
+    """AuthTokenSerializer for async views, is_valid() only validates
+    the fields and `aauthenticate()` checks the credentials"""
+
+    def validate(self, attrs):
+        return attrs
+
+    async def aauthenticate(self, request=None):
+        """The user of the validated credentials, raises ValidationError
+        as is_valid() would"""
+        user = await aauthenticate(
+            request,
+            email=self.validated_data["email"],
+            password=self.validated_data["password"],
+        )
+        try:
+            self.check_user(user)
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError(
+                serializers.as_serializer_error(error)
+            )
+        return user
+
+
+def _access_token(refresh, user):
+    """Access token of the refresh token with the claims needed to
+    authorize requests without a query, read from the user at issue time.
+    They stay off refresh tokens, which would copy them unchanged into
+    every access token for the whole refresh lifetime."""
+    access = refresh.access_token
+    access["email"] = user.email
+    access["is_staff"] = user.is_staff
+    return access
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    def validate(self, attrs):
+        data = jwt_serializers.TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(_access_token(refresh, self.user))
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return data
+
+
+def _is_revoked(refresh):
+    return RevokedToken.objects.filter(
+        jti=refresh[jwt_settings.JTI_CLAIM]
+    ).exists()
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if _is_revoked(refresh):
+            raise InvalidToken(_("Token is revoked"))
+        data = super().validate(attrs)
+
+        user = get_user_model().objects.get(
+            **{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]}
+        )
+        data["access"] = str(_access_token(refresh, user))
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+
+    def save(self, **kwargs):
+        """Add the token to the denylist and drop expired entries"""
+        refresh = self.validated_data["refresh"]
+        RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        RevokedToken.objects.get_or_create(
+            jti=refresh[jwt_settings.JTI_CLAIM],
+            defaults={"expires_at": datetime_from_epoch(refresh["exp"])},
+        )
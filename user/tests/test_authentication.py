@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+
+ME_URL = reverse("user:manage")
+GENRE_URL = reverse("cinema:genre-list")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_known_token_is_resolved_without_query(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "user@myproject.com")
+
+    def test_requests_do_not_share_the_cached_user(self):
+        authentication = CachedTokenAuthentication()
+        first, _ = authentication.authenticate_credentials(self.token.key)
+        first.email = "changed@myproject.com"
+
+        second, _ = authentication.authenticate_credentials(self.token.key)
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.email, "user@myproject.com")
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_change_is_seen(self):
+        self.client.get(GENRE_URL)
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_through_manage_view_refreshes_user(self):
+        self.client.patch(ME_URL, {"email": "new@myproject.com"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "new@myproject.com")
+
+
+class TokenCacheTests(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        tokens = [Token(key=str(index), user_id=index) for index in range(3)]
+        cache.set("0", tokens[0])
+        cache.set("1", tokens[1])
+        cache.get("0")
+        cache.set("2", tokens[2])
+
+        self.assertIsNone(cache.get("1"))
+        self.assertIs(cache.get("0"), tokens[0])
+
+    def test_expired_entry_is_dropped(self):
+        cache = TokenCache(max_size=2, ttl=0)
+        cache.set("0", Token(key="0", user_id=1))
+
+        self.assertIsNone(cache.get("0"))
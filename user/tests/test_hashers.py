@@ -0,0 +1,135 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    ScryptPasswordHasher,
+    make_password,
+    verify_password,
+)
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.hashers import TunedScryptPasswordHasher
+
+LOGIN_URL = reverse("user:login")
+ASYNC_LOGIN_URL = reverse("user:login-async")
+REGISTER_URL = reverse("user:create")
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_registration_uses_tuned_scrypt_parameters(self):
+        self.client.post(
+            REGISTER_URL, {"email": "user@myproject.com", "password": "pass1"}
+        )
+
+        user = get_user_model().objects.get(email="user@myproject.com")
+        algorithm, work_factor, _, block_size, parallelism, _ = (
+            user.password.split("$")
+        )
+        self.assertEqual(
+            (algorithm, work_factor, block_size, parallelism),
+            ("scrypt", "8192", "8", "10"),
+        )
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        user = get_user_model().objects.create(
+            email="user@myproject.com",
+            password=make_password("password", hasher="pbkdf2_sha256"),
+        )
+
+        res = self.client.post(
+            LOGIN_URL, {"email": "user@myproject.com", "password": "password"}
+        )
+        user.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(user.password.startswith("scrypt$"))
+        self.assertTrue(user.check_password("password"))
+
+    def test_django_scrypt_hash_is_upgraded_on_login(self):
+        hasher = ScryptPasswordHasher()
+        user = get_user_model().objects.create(
+            email="user@myproject.com",
+            password=hasher.encode("password", hasher.salt()),
+        )
+
+        res = self.client.post(
+            LOGIN_URL, {"email": "user@myproject.com", "password": "password"}
+        )
+        user.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(user.password.split("$")[1:5:3], ["8192", "10"])
+        self.assertTrue(user.check_password("password"))
+
+    @override_settings(
+        PASSWORD_SCRYPT_WORK_FACTOR=2**14, PASSWORD_SCRYPT_PARALLELISM=1
+    )
+    def test_scrypt_parameters_below_owasp_minimums_are_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            TunedScryptPasswordHasher()
+
+
+class AsyncLoginTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+
+    async def login(self, password):
+        return await self.async_client.post(
+            ASYNC_LOGIN_URL,
+            {"email": "user@myproject.com", "password": password},
+            content_type="application/json",
+        )
+
+    async def test_login_returns_token(self):
+        res = await self.login("password")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()["token"]), 40)
+
+    async def test_wrong_password_is_rejected(self):
+        res = await self.login("wrong")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.json(),
+            {
+                "non_field_errors": [
+                    "Unable to log in with provided credentials."
+                ]
+            },
+        )
+
+    async def test_password_is_verified_in_hashing_pool(self):
+        threads = []
+
+        def verify(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return verify_password(*args, **kwargs)
+
+        with mock.patch("user.hashers.verify_password", side_effect=verify):
+            res = await self.login("password")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hashing"))
+
+    async def test_legacy_hash_is_upgraded_on_async_login(self):
+        self.user.password = make_password("password", hasher="pbkdf2_sha256")
+        await self.user.asave()
+
+        res = await self.login("password")
+        await self.user.arefresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.user.password.startswith("scrypt$"))
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.cache import catalog_cache
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+REVOKE_URL = reverse("user:token_revoke")
+ME_URL = reverse("user:manage")
+GENRE_URL = reverse("cinema:genre-list")
+ORDER_URL = reverse("cinema:order-list")
+
+
+class JWTTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+
+    def obtain_tokens(self, email="user@myproject.com"):
+        return self.client.post(
+            TOKEN_URL, {"email": email, "password": "password"}
+        ).data
+
+    def authorize(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_catalog_is_authorized_from_claims_without_query(self):
+        self.authorize(self.obtain_tokens()["access"])
+        self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_staff_claim_allows_writes(self):
+        get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.authorize(self.obtain_tokens("admin@myproject.com")["access"])
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_non_staff_claim_forbids_writes(self):
+        self.authorize(self.obtain_tokens()["access"])
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_orders_of_token_user(self):
+        self.authorize(self.obtain_tokens()["access"])
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_manage_user_with_access_token(self):
+        self.authorize(self.obtain_tokens()["access"])
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "user@myproject.com")
+
+    def test_revoked_refresh_token_is_rejected(self):
+        refresh = self.obtain_tokens()["refresh"]
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.post(REVOKE_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_invalid_token(self):
+        res = self.client.post(REVOKE_URL, {"refresh": "invalid"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_refresh_reads_claims_from_the_user(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        refresh = self.obtain_tokens("admin@myproject.com")["refresh"]
+        admin.is_staff = False
+        admin.email = "former.admin@myproject.com"
+        admin.save()
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.authorize(res.data["access"])
+
+        self.assertEqual(
+            self.client.post(GENRE_URL, {"name": "Drama"}).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        self.assertEqual(
+            self.client.get(ME_URL).data["email"],
+            "former.admin@myproject.com",
+        )
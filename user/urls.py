@@ -1,10 +1,27 @@
 from django.urls import path
-from user.views import CreateUserView, CreateTokenView, ManageUserView
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+)
+
+from user.views import (
+    CreateUserView,
+    CreateTokenView,
+    AsyncCreateTokenView,
+    ManageUserView,
+    RevokeTokenView,
+)
 
 app_name = "user"
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
     path("login/", CreateTokenView.as_view(), name="login"),
+    path(
+        "login/async/", AsyncCreateTokenView.as_view(), name="login-async"
+    ),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/revoke/", RevokeTokenView.as_view(), name="token_revoke"),
 ]
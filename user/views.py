@@ -1,13 +1,29 @@
-from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
+import json
+
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import generics, status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from user.serializers import UserSerializer, AuthTokenSerializer
+from cinema_service.instrumentation import SerializationTimingMixin
+from user.authentication import CachedTokenAuthentication
+from user.serializers import (
+    UserSerializer,
+    AuthTokenSerializer,
+    AsyncAuthTokenSerializer,
+    TokenRevokeSerializer,
+)
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(SerializationTimingMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
@@ -16,10 +32,51 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncCreateTokenView(View):
+    """CreateTokenView for ASGI deployments, the password is hashed
+    in the bounded hashing thread pool and the event loop keeps serving
+    other requests meanwhile"""
+
+    async def post(self, request):
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                return JsonResponse(
+                    {"detail": "JSON parse error."}, status=400
+                )
+        else:
+            data = request.POST
+
+        serializer = AsyncAuthTokenSerializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+            user = await serializer.aauthenticate(request)
+        except ValidationError as error:
+            return JsonResponse(error.detail, status=400)
+
+        token, _ = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({"token": token.key})
+
+
+class ManageUserView(
+    SerializationTimingMixin, generics.RetrieveUpdateAPIView
+):
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication, JWTAuthentication)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+
+class RevokeTokenView(generics.GenericAPIView):
+    serializer_class = TokenRevokeSerializer
+    authentication_classes = ()
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)